@@ -1,6 +1,8 @@
-from optparse import Option
 from typing import List, Optional, Dict, Any, TypedDict
 
+# Number of consecutive departure days searched for flights/hotels
+SEARCH_DAYS = 3
+
 class TravelSearchState(TypedDict, total=False):
     # Thread / conversation
     thread_id: str
@@ -40,48 +42,25 @@ class TravelSearchState(TypedDict, total=False):
     normalized_cabin: Optional[str]
     normalized_trip_type: Optional[str]
     
-    # Flight results
-    flight_offers_day_1: Optional[List[Dict[str, Any]]]
-    flight_offers_day_2: Optional[List[Dict[str, Any]]]
-    flight_offers_day_3: Optional[List[Dict[str, Any]]]
-    flight_offers_day_4: Optional[List[Dict[str, Any]]]
-    flight_offers_day_5: Optional[List[Dict[str, Any]]]
-    flight_offers_day_6: Optional[List[Dict[str, Any]]]
-    flight_offers_day_7: Optional[List[Dict[str, Any]]]
+    # Flight results (one list of offers per search day, index 0 = day 1)
+    flight_offers_by_day: Optional[List[List[Dict[str, Any]]]]
     formatted_results: Optional[List[Dict[str, Any]]]
     
     # Hotel search
     hotel_ids: Optional[List[str]]
     hotel_id: Optional[List[str]]
     city_code: Optional[str]
-    checkin_date_day_1: Optional[str]
-    checkout_date_day_1: Optional[str]
-    checkin_date_day_2: Optional[str]
-    checkout_date_day_2: Optional[str]
-    checkin_date_day_3: Optional[str]
-    checkout_date_day_3: Optional[str]
-    checkin_date_day_4: Optional[str]
-    checkout_date_day_4: Optional[str]
-    checkin_date_day_5: Optional[str]
-    checkout_date_day_5: Optional[str]
-    checkin_date_day_6: Optional[str]
-    checkout_date_day_6: Optional[str]
-    checkin_date_day_7: Optional[str]
-    checkout_date_day_7: Optional[str]
+    checkin_dates: Optional[List[Optional[str]]]  # Per search day, index 0 = day 1
+    checkout_dates: Optional[List[Optional[str]]]
     currency: Optional[str]
     room_quantity: Optional[int]
     adult: Optional[int]
     
-    # Hotel results
-    hotel_offers_duration_1: Optional[List[Dict[str, Any]]]
-    hotel_offers_duration_2: Optional[List[Dict[str, Any]]]
-    hotel_offers_duration_3: Optional[List[Dict[str, Any]]]
-    hotel_offers_duration_4: Optional[List[Dict[str, Any]]]
-    hotel_offers_duration_5: Optional[List[Dict[str, Any]]]
-    hotel_offers_duration_6: Optional[List[Dict[str, Any]]]
-    hotel_offers_duration_7: Optional[List[Dict[str, Any]]]
+    # Hotel results (one list of offers per search day, index 0 = day 1)
+    hotel_offers_by_duration: Optional[List[List[Dict[str, Any]]]]
     hotel_offers: Optional[List[Dict[str, Any]]]
     travel_packages: List[Dict]
+    travel_packages_by_id: Optional[Dict[int, Dict]]  # package_id -> package
     
     # Company hotels
     company_hotels_path: Optional[str]
@@ -120,10 +99,14 @@ class TravelSearchState(TypedDict, total=False):
     # Document verification
     passport_uploaded: bool
     passport_data: Optional[List[Dict[str, Any]]]
+    passport_valid: Optional[bool]  # set at upload time: any passport parsed without error
+    passport_count: Optional[int]  # set at upload time: passports parsed without error
     passport_file_paths: Optional[List[str]]
     
     visa_uploaded: bool
     visa_data: Optional[List[Dict[str, Any]]]
+    visa_valid: Optional[bool]  # set at upload time: any visa parsed without error
+    visa_count: Optional[int]  # set at upload time: visas parsed without error
     visa_file_paths: Optional[List[str]]
     
     # Booking confirmation
@@ -1,93 +1,102 @@
-from datetime import datetime, date
+from datetime import date, datetime
+from functools import lru_cache
 from Models.TravelSearchState import TravelSearchState
 
-def analyze_conversation_node(state: TravelSearchState) -> TravelSearchState:
-    """Validate the information extracted by the LLM conversation node based on request_type and trip_type."""
+# Required fields per (request_type, trip_type); trip_type None applies to any trip type.
+# Tuples are ordered by follow-up question priority.
+_CORE_FIELDS = ("origin", "destination", "departure_date")
+_REQUIRED_FIELDS = {
+    ("hotels", None): _CORE_FIELDS + ("duration",),
+    ("flights", "round_trip"): _CORE_FIELDS + ("duration", "cabin_class"),
+    ("flights", None): _CORE_FIELDS + ("cabin_class",),
+    ("packages", "round_trip"): _CORE_FIELDS + ("duration", "cabin_class"),
+    ("packages", None): _CORE_FIELDS + ("cabin_class",),
+}
 
-    # Determine which fields are still missing or invalid
-    missing_fields = []
+# Fields that do not apply to a request and are cleared from state
+_CLEARED_FIELDS = {
+    ("hotels", None): ("cabin_class",),
+    ("flights", "one_way"): ("duration",),
+    ("packages", "one_way"): ("duration",),
+}
 
-    # Validate departure date (ALWAYS REQUIRED)
+_FOLLOWUP_QUESTIONS = {
+    "origin": "Which city are you departing from?",
+    "destination": "Which city would you like to go to?",
+    "departure_date": "What is your departure date? (YYYY-MM-DD)",
+    "duration": "How many days will your trip last?",
+    "cabin_class": "Which cabin class do you prefer (economy, business, or first)?",
+}
+_HOTEL_DURATION_QUESTION = "How many nights will you be staying?"
+
+
+def _lookup(table: dict, request_type: str, trip_type: str, default=()):
+    """Find the entry for (request_type, trip_type), falling back to any trip type."""
+    return table.get((request_type, trip_type)) or table.get((request_type, None), default)
+
+
+def _is_valid(state: TravelSearchState, field: str, date_valid: bool) -> bool:
+    """Check a single required field. Duration 0 is a valid value."""
+    if field == "departure_date":
+        return date_valid
+    if field == "duration":
+        return state.get("duration") is not None
+    return bool(state.get(field))
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso_date(value: str):
+    """Parse a YYYY-MM-DD string, returning None if it is not a valid date.
+    Uses strptime rather than fromisoformat, which also accepts forms like 20251231
+    that the downstream "%Y-%m-%d" parsers reject."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _validate_departure_date(state: TravelSearchState) -> bool:
+    """Check departure_date is a YYYY-MM-DD date that is not in the past. Invalid or past dates are cleared."""
     departure_date = state.get("departure_date")
-    if departure_date:
-        try:
-            parsed_date = datetime.strptime(departure_date, "%Y-%m-%d").date()
-            if parsed_date < datetime.now().date():
-                missing_fields.append("departure_date")
-                state["departure_date"] = None
-        except ValueError:
-            missing_fields.append("departure_date")
-            state["departure_date"] = None
-    else:
-        missing_fields.append("departure_date")
+    if not departure_date:
+        return False
+    parsed_date = _parse_iso_date(departure_date)
+    if parsed_date is None:
+        state["departure_date"] = None
+        return False
+    if parsed_date < date.today():
+        state["departure_date"] = None
+        return False
+    return True
+
 
-    # Validate origin and destination (ALWAYS REQUIRED)
-    if not state.get("origin"):
-        missing_fields.append("origin")
-    if not state.get("destination"):
-        missing_fields.append("destination")
+def analyze_conversation_node(state: TravelSearchState) -> TravelSearchState:
+    """Validate the information extracted by the LLM conversation node based on request_type and trip_type."""
+
+    # Validate departure date (ALWAYS REQUIRED)
+    date_valid = _validate_departure_date(state)
 
     # Get request type and trip type
     request_type = state.get("request_type", "packages")
     trip_type = state.get("trip_type", "round_trip")
 
-    # CONDITIONAL VALIDATION BASED ON REQUEST TYPE AND TRIP TYPE
-    
-    # Duration validation
-    if request_type == "hotels":
-        # Hotels ALWAYS need duration (number of nights)
-        if state.get("duration") is None:
-            missing_fields.append("duration")
-    elif request_type in ["flights", "packages"]:
-        if trip_type == "round_trip":
-            # Round trip needs duration (days until return)
-            if state.get("duration") is None:
-                missing_fields.append("duration")
-        elif trip_type == "one_way":
-            # One-way does NOT need duration - set to None if present
-            state["duration"] = None
-    
-    # Cabin class validation (only for flights/packages)
-    if request_type in ["flights", "packages"]:
-        if not state.get("cabin_class"):
-            missing_fields.append("cabin_class")
-    elif request_type == "hotels":
-        # Hotels don't need cabin class
-        state["cabin_class"] = None
-
-    # Build required fields list dynamically based on request_type and trip_type
-    required_fields = ["departure_date", "origin", "destination"]
-    
-    if request_type == "hotels":
-        required_fields.extend(["duration"])
-    elif request_type in ["flights", "packages"]:
-        required_fields.append("cabin_class")
-        if trip_type == "round_trip":
-            required_fields.append("duration")
-    
-    # Check if all required fields are present
-    core_complete = all(field not in missing_fields for field in required_fields)
-
-    if not core_complete:
+    for field in _lookup(_CLEARED_FIELDS, request_type, trip_type):
+        state[field] = None
+
+    required_fields = _lookup(_REQUIRED_FIELDS, request_type, trip_type, _CORE_FIELDS)
+    missing_fields = [field for field in required_fields if not _is_valid(state, field, date_valid)]
+
+    if missing_fields:
         state["info_complete"] = False
         state["needs_followup"] = True
 
         # Generate a single, specific follow-up question if not already provided by LLM
         if not state.get("followup_question"):
-            question = None
-            if "origin" in missing_fields:
-                question = "Which city are you departing from?"
-            elif "destination" in missing_fields:
-                question = "Which city would you like to go to?"
-            elif "departure_date" in missing_fields:
-                question = "What is your departure date? (YYYY-MM-DD)"
-            elif "duration" in missing_fields:
-                if request_type == "hotels":
-                    question = "How many nights will you be staying?"
-                else:  # round trip flights/packages
-                    question = "How many days will your trip last?"
-            elif "cabin_class" in missing_fields:
-                question = "Which cabin class do you prefer (economy, business, or first)?"
+            first_missing = missing_fields[0]
+            if first_missing == "duration" and request_type == "hotels":
+                question = _HOTEL_DURATION_QUESTION
+            else:
+                question = _FOLLOWUP_QUESTIONS.get(first_missing)
 
             state["followup_question"] = question or "Could you provide more details about your travel?"
     else:
@@ -99,4 +108,4 @@ def analyze_conversation_node(state: TravelSearchState) -> TravelSearchState:
         state["trip_type"] = trip_type
 
     state["current_node"] = "analyze_conversation"
-    return state
\ No newline at end of file
+    return state
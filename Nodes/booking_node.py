@@ -4,171 +4,45 @@ Handles package booking with passport and visa verification
 Clean, professional HTML outputs without colors
 """
 from Models.TravelSearchState import TravelSearchState
-from typing import Dict, Any
+from Nodes.create_packages import package_card_fields
+from typing import Dict, Any, Optional
 import logging
-import uuid
+import re
+import secrets
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
+_BANNER = "=" * 60
+_START_BANNER = f"{_BANNER}\nBOOKING NODE STARTED\n{_BANNER}"
 
-def booking_node(state: TravelSearchState) -> TravelSearchState:
-    """
-    Handle travel package booking with document verification.
-    
-    Flow:
-    1. Check if package is selected
-    2. Verify passport and visa uploads
-    3. Confirm booking or request missing documents
-    """
-    
-    logger.info("=" * 60)
-    logger.info("BOOKING NODE STARTED")
-    logger.info("=" * 60)
-    
-    thread_id = state.get("thread_id")
-    selected_package_id = state.get("selected_package_id")
-    travel_packages = state.get("travel_packages", [])
-    
-    # DEBUG: Log critical state information
-    logger.info(f"Thread ID: {thread_id}")
-    logger.info(f"Selected Package ID: {selected_package_id}")
-    logger.info(f"Travel Packages Count: {len(travel_packages)}")
-    if travel_packages:
-        logger.info(f"First Package Preview: {travel_packages[0].get('package_id', 'N/A')}")
-    else:
-        logger.error("❌ NO TRAVEL PACKAGES IN STATE!")
-    logger.info(f"Passport Uploaded: {state.get('passport_uploaded', False)}")
-    logger.info(f"Visa Uploaded: {state.get('visa_uploaded', False)}")
-    logger.info(f"Booking In Progress: {state.get('booking_in_progress', False)}")
-    logger.info(f"State Keys: {list(state.keys())[:10]}...")
-    
-    # Check if we have packages to book
-    if not travel_packages:
-        logger.error("❌ NO TRAVEL PACKAGES FOUND IN STATE!")
-        logger.error(f"Available state keys: {list(state.keys())}")
-        state["booking_error"] = "No travel packages available for booking"
-        state["booking_html"] = generate_error_html(
-            "You need to search for packages first. search for flights offers first!"
-        )
-        state["current_node"] = "booking"
-        return state
-    
-    # If no package selected yet, show selection interface
-    if not selected_package_id:
-        logger.info("No package selected - showing selection interface")
-        state["booking_html"] = generate_package_selection_html(travel_packages)
-        state["booking_in_progress"] = True
-        state["needs_followup"] = True
-        state["followup_question"] = "Which package would you like to book? Please specify the package number."
-        state["current_node"] = "booking"
-        return state
-    
-    # Find the selected package
-    selected_package = None
-    for pkg in travel_packages:
-        if pkg.get("package_id") == selected_package_id:
-            selected_package = pkg
-            break
-    
-    if not selected_package:
-        logger.error(f"❌ Package {selected_package_id} not found in {len(travel_packages)} packages")
-        state["booking_error"] = f"Package {selected_package_id} not found"
-        state["booking_html"] = generate_error_html(
-            f"Package {selected_package_id} not found. Please select a valid package."
-        )
-        state["current_node"] = "booking"
-        return state
-    
-    state["selected_package"] = selected_package
-    logger.info(f"✓ Package {selected_package_id} selected")
-    
-    # Check document uploads
-    passport_uploaded = state.get("passport_uploaded", False)
-    visa_uploaded = state.get("visa_uploaded", False)
-    
-    passport_data = state.get("passport_data", [])
-    visa_data = state.get("visa_data", [])
-    
-    logger.info(f"Document data - Passports: {len(passport_data)}, Visas: {len(visa_data)}")
-    
-    # Validate passport data
-    passport_valid = False
-    if passport_uploaded and passport_data:
-        passport_valid = any("error" not in p for p in passport_data)
-        logger.info(f"Passport validation: {passport_valid} ({len(passport_data)} documents)")
-    
-    # Validate visa data
-    visa_valid = False
-    if visa_uploaded and visa_data:
-        visa_valid = any("error" not in v for v in visa_data)
-        logger.info(f"Visa validation: {visa_valid} ({len(visa_data)} documents)")
-    
-    logger.info(f"Final document status - Passport: {passport_valid}, Visa: {visa_valid}")
-    
-    # Generate status HTML
-    missing_documents = []
-    if not passport_valid:
-        missing_documents.append("passport")
-    if not visa_valid:
-        missing_documents.append("visa")
-    
-    if missing_documents:
-        logger.info(f"⚠️ Missing documents: {missing_documents}")
-        state["booking_html"] = generate_document_request_html(
-            selected_package, 
-            passport_valid, 
-            visa_valid,
-            passport_data if passport_valid else None,
-            visa_data if visa_valid else None
-        )
-        state["booking_in_progress"] = True
-        state["needs_followup"] = True
-        state["followup_question"] = f"Please upload your {' and '.join(missing_documents)} to continue with the booking."
-        state["current_node"] = "booking"
-        return state
-    
-    # All documents verified - confirm booking
-    logger.info("✅ All documents verified - confirming booking")
-    booking_reference = generate_booking_reference()
-    
-    state["booking_confirmed"] = True
-    state["booking_reference"] = booking_reference
-    state["booking_html"] = generate_booking_confirmation_html(
-        selected_package,
-        passport_data,
-        visa_data,
-        booking_reference
-    )
-    state["booking_in_progress"] = False
-    state["needs_followup"] = False
-    state["current_node"] = "booking"
-    
-    logger.info(f"✅ Booking confirmed: {booking_reference}")
-    logger.info("=" * 60)
-    
-    return state
+# ============================================================================
+# STATIC HTML - CSS and fixed markup kept out of the f-strings per call
+# ============================================================================
 
+def _minify_css(css: str) -> str:
+    """Collapse the whitespace of a <style> block (run once at import)"""
+    css = re.sub(r'\s+', ' ', css).strip()
+    return re.sub(r'\s*([{};,])\s*', r'\1', css)
 
-def generate_booking_reference() -> str:
-    """Generate unique booking reference number"""
-    timestamp = datetime.now().strftime("%Y%m%d")
-    unique_id = str(uuid.uuid4())[:8].upper()
-    return f"BK{timestamp}{unique_id}"
 
-
-def generate_package_selection_html(packages: list) -> str:
-    """Generate clean, professional HTML for package selection"""
-    
-    html_parts = ["""
-    <style>
+def _booking_container_rule(max_width: str) -> str:
+    """Page container rule shared by the booking views (only the width differs)"""
+    return """
         .booking-container {
-            max-width: 900px;
+            max-width: %s;
             margin: 0 auto;
             padding: 20px;
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
             line-height: 1.6;
         }
+""" % max_width
+
+
+# Page header rules shared by the selection and document request views
+_SECTION_HEADER_RULES = """
         .section-header {
             border-bottom: 2px solid #000;
             padding-bottom: 12px;
@@ -185,6 +59,10 @@ def generate_package_selection_html(packages: list) -> str:
             margin: 4px 0 0 0;
             opacity: 0.7;
         }
+"""
+
+_SELECTION_CSS = _minify_css(
+    "<style>" + _booking_container_rule("900px") + _SECTION_HEADER_RULES + """
         .info-box {
             border: 1px solid #ddd;
             padding: 16px;
@@ -201,7 +79,7 @@ def generate_package_selection_html(packages: list) -> str:
             margin-bottom: 16px;
             position: relative;
         }
-        .package-card.optimal {
+        .package-card[data-optimal="1"] {
             border: 2px solid #000;
         }
         .package-header {
@@ -248,7 +126,15 @@ def generate_package_selection_html(packages: list) -> str:
             font-size: 15px;
             font-weight: 500;
         }
-    </style>
+    </style>""")
+
+# Plural suffix indexed by count == 1
+_PLURAL_SUFFIX = ("s", "")
+
+# Badge fragment indexed by is_optimal
+_OPTIMAL_BADGE = ("", '<span class="optimal-badge">Best Value</span>')
+
+_SELECTION_HEADER = """
     
     <div class="booking-container">
         <div class="section-header">
@@ -259,287 +145,102 @@ def generate_package_selection_html(packages: list) -> str:
         <div class="info-box">
             <p><strong>How to book:</strong> Reply with the package number (e.g., "book package 1" or "package 1")</p>
         </div>
-    """]
-    
-    for pkg in packages:
-        pkg_id = pkg.get("package_id", 0)
-        is_optimal = pkg.get("is_optimal", False)
-        travel_dates = pkg.get("travel_dates", {})
-        pricing = pkg.get("pricing", {})
-        hotels = pkg.get("hotels", {})
-        flight_offer = pkg.get("flight_offer", {})
-        
-        duration = travel_dates.get("duration_nights", "N/A")
-        checkin = travel_dates.get("checkin", "N/A")
-        checkout = travel_dates.get("checkout", "N/A")
-        
-        flight_price = pricing.get("flight_price", 0)
-        flight_currency = pricing.get("flight_currency", "")
-        hotel_price = hotels.get("min_price", 0)
-        hotel_currency = hotels.get("currency", "N/A")
-        available_hotels = hotels.get("available_count", 0)
-        
-        # Get flight summary
-        summary = flight_offer.get("summary", {})
-        outbound = summary.get("outbound", {})
-        stops = outbound.get("stops", 0)
-        stops_text = "Direct flight" if stops == 0 else f"{stops} stop(s)"
-        
-        card_class = "package-card optimal" if is_optimal else "package-card"
-        
-        html_parts.append(f"""
-        <div class="{card_class}">
-            <div class="package-header">
-                <h2 class="package-title">Package {pkg_id}</h2>
-                {f'<span class="optimal-badge">Best Value</span>' if is_optimal else ''}
-            </div>
-            
-            <div class="package-grid">
-                <div class="detail-item">
-                    <span class="detail-label">Duration</span>
-                    <span class="detail-value">{duration} night{'s' if duration != 1 else ''}</span>
-                </div>
-                <div class="detail-item">
-                    <span class="detail-label">Travel Dates</span>
-                    <span class="detail-value">{checkin} to {checkout}</span>
-                </div>
-                <div class="detail-item">
-                    <span class="detail-label">Flight Price</span>
-                    <span class="detail-value">{flight_price:,.2f} {flight_currency}</span>
-                </div>
-                <div class="detail-item">
-                    <span class="detail-label">Hotels From</span>
-                    <span class="detail-value">{hotel_price:,.2f} {hotel_currency}</span>
-                </div>
-                <div class="detail-item">
-                    <span class="detail-label">Flight Type</span>
-                    <span class="detail-value">{stops_text}</span>
-                </div>
-                <div class="detail-item">
-                    <span class="detail-label">Hotels Available</span>
-                    <span class="detail-value">{available_hotels} options</span>
-                </div>
-            </div>
-        </div>
-        """)
-    
-    html_parts.append("</div>")
-    
-    return "".join(html_parts)
-
+    """
 
-def generate_document_request_html(package: dict, passport_valid: bool, visa_valid: bool, 
-                                   passport_data: list = None, visa_data: list = None) -> str:
-    """Generate clean HTML showing selected package and requesting documents"""
-    
-    pkg_id = package.get("package_id", 0)
-    travel_dates = package.get("travel_dates", {})
-    pricing = package.get("pricing", {})
-    
-    checkin = travel_dates.get("checkin", "N/A")
-    checkout = travel_dates.get("checkout", "N/A")
-    duration = travel_dates.get("duration_nights", "N/A")
-    flight_price = pricing.get("flight_price", 0)
-    flight_currency = pricing.get("flight_currency", "")
-    
-    html = f"""
-    <style>
-        .booking-container {{
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-        }}
-        .section-header {{
-            border-bottom: 2px solid #000;
-            padding-bottom: 12px;
-            margin-bottom: 24px;
-        }}
-        .section-title {{
-            font-size: 24px;
-            font-weight: 600;
-            margin: 0;
-            letter-spacing: -0.5px;
-        }}
-        .section-subtitle {{
-            font-size: 14px;
-            margin: 4px 0 0 0;
-            opacity: 0.7;
-        }}
-        .info-card {{
+_DOCUMENT_REQUEST_CSS = _minify_css(
+    "<style>" + _booking_container_rule("800px") + _SECTION_HEADER_RULES + """
+        .info-card {
             border: 1px solid #ddd;
             padding: 20px;
             margin-bottom: 16px;
-        }}
-        .card-title {{
+        }
+        .card-title {
             font-size: 16px;
             font-weight: 600;
             margin: 0 0 16px 0;
             text-transform: uppercase;
             letter-spacing: 0.5px;
             font-size: 12px;
-        }}
-        .status-list {{
+        }
+        .status-list {
             list-style: none;
             padding: 0;
             margin: 0;
-        }}
-        .status-item {{
+        }
+        .status-item {
             display: flex;
             align-items: center;
             padding: 12px 0;
             border-bottom: 1px solid #eee;
-        }}
-        .status-item:last-child {{
+        }
+        .status-item:last-child {
             border-bottom: none;
-        }}
-        .status-icon {{
+        }
+        .status-icon {
             margin-right: 12px;
             font-size: 18px;
-        }}
-        .status-content {{
+        }
+        .status-content {
             flex: 1;
-        }}
-        .status-title {{
+        }
+        .status-title {
             font-weight: 600;
             margin: 0 0 4px 0;
-        }}
-        .status-description {{
+        }
+        .status-description {
             font-size: 13px;
             opacity: 0.7;
             margin: 0;
-        }}
-        .alert-box {{
+        }
+        .alert-box {
             border: 2px solid #000;
             padding: 20px;
             margin-top: 16px;
             background: #fafafa;
-        }}
-        .alert-title {{
+        }
+        .alert-title {
             font-weight: 600;
             margin: 0 0 12px 0;
             font-size: 16px;
-        }}
-        .alert-text {{
+        }
+        .alert-text {
             margin: 0 0 12px 0;
             font-size: 14px;
-        }}
-        .required-list {{
+        }
+        .required-list {
             margin: 12px 0;
             padding-left: 20px;
-        }}
-        .required-list li {{
+        }
+        .required-list li {
             margin-bottom: 8px;
-        }}
-    </style>
-    
-    <div class="booking-container">
-        <div class="section-header">
-            <h1 class="section-title">Package {pkg_id} Selected</h1>
-            <p class="section-subtitle">{duration} nights: {checkin} to {checkout} • Flight: {flight_price:,.2f} {flight_currency}</p>
-        </div>
-        
-        <div class="info-card">
-            <h2 class="card-title">Document Verification Status</h2>
-            
-            <ul class="status-list">
-                <li class="status-item">
-                    <span class="status-icon">{'✓' if passport_valid else '✗'}</span>
-                    <div class="status-content">
-                        <p class="status-title">Passport</p>
-                        <p class="status-description">
-                            {f'Verified ({len(passport_data)} document(s))' if passport_valid else 'Not uploaded or invalid'}
-                        </p>
-                    </div>
-                </li>
-                
-                <li class="status-item">
-                    <span class="status-icon">{'✓' if visa_valid else '✗'}</span>
-                    <div class="status-content">
-                        <p class="status-title">Visa</p>
-                        <p class="status-description">
-                            {f'Verified ({len(visa_data)} document(s))' if visa_valid else 'Not uploaded or invalid'}
-                        </p>
-                    </div>
-                </li>
-            </ul>
-        </div>
-        
-        <div class="alert-box">
-            <h3 class="alert-title">Action Required</h3>
-            <p class="alert-text">To complete your booking, please upload the following document(s):</p>
-            <ul class="required-list">
-                {f'<li><strong>Passport</strong> — Valid travel document required</li>' if not passport_valid else ''}
-                {f'<li><strong>Visa</strong> — Valid visa document required</li>' if not visa_valid else ''}
-            </ul>
-            <p class="alert-text" style="font-size: 13px; opacity: 0.8; font-style: italic; margin-top: 16px;">
-                Once you upload the required documents, the system will automatically verify them and confirm your booking.
-            </p>
-        </div>
-    </div>
-    """
-    
-    return html
-
+        }
+    </style>""")
 
-def generate_booking_confirmation_html(package: dict, passport_data: list, visa_data: list, booking_ref: str) -> str:
-    """Generate clean HTML for booking confirmation"""
-    
-    pkg_id = package.get("package_id", 0)
-    travel_dates = package.get("travel_dates", {})
-    pricing = package.get("pricing", {})
-    hotels = package.get("hotels", {})
-    
-    checkin = travel_dates.get("checkin", "N/A")
-    checkout = travel_dates.get("checkout", "N/A")
-    duration = travel_dates.get("duration_nights", "N/A")
-    flight_price = pricing.get("flight_price", 0)
-    flight_currency = pricing.get("flight_currency", "")
-    hotel_price = hotels.get("min_price", 0)
-    hotel_currency = hotels.get("currency", "N/A")
-    
-    # Get traveler info from passport
-    traveler_name = "N/A"
-    passport_number = "N/A"
-    if passport_data and len(passport_data) > 0:
-        first_passport = passport_data[0]
-        if "error" not in first_passport:
-            traveler_name = first_passport.get("full_name", "N/A")
-            passport_number = first_passport.get("passport_number", "N/A")
-    
-    html = f"""
-    <style>
-        .booking-container {{
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-        }}
-        .confirmation-banner {{
+_CONFIRMATION_CSS = _minify_css(
+    "<style>" + _booking_container_rule("800px") + """
+        .confirmation-banner {
             border: 3px solid #000;
             padding: 32px;
             margin-bottom: 24px;
             text-align: center;
             background: #fafafa;
-        }}
-        .confirmation-icon {{
+        }
+        .confirmation-icon {
             font-size: 48px;
             margin-bottom: 16px;
-        }}
-        .confirmation-title {{
+        }
+        .confirmation-title {
             font-size: 28px;
             font-weight: 700;
             margin: 0 0 8px 0;
             letter-spacing: -0.5px;
-        }}
-        .confirmation-subtitle {{
+        }
+        .confirmation-subtitle {
             font-size: 14px;
             margin: 0 0 20px 0;
             opacity: 0.7;
-        }}
-        .booking-reference {{
+        }
+        .booking-reference {
             font-family: 'Courier New', monospace;
             font-size: 20px;
             font-weight: 700;
@@ -548,13 +249,13 @@ def generate_booking_confirmation_html(package: dict, passport_data: list, visa_
             border: 2px solid #000;
             display: inline-block;
             background: #fff;
-        }}
-        .info-section {{
+        }
+        .info-section {
             border: 1px solid #ddd;
             padding: 20px;
             margin-bottom: 16px;
-        }}
-        .section-title {{
+        }
+        .section-title {
             font-size: 12px;
             font-weight: 600;
             text-transform: uppercase;
@@ -562,41 +263,400 @@ def generate_booking_confirmation_html(package: dict, passport_data: list, visa_
             margin: 0 0 16px 0;
             padding-bottom: 8px;
             border-bottom: 1px solid #ddd;
-        }}
-        .info-table {{
+        }
+        .info-table {
             width: 100%;
             border-collapse: collapse;
-        }}
-        .info-row {{
+        }
+        .info-row {
             display: flex;
             justify-content: space-between;
             padding: 10px 0;
             border-bottom: 1px solid #eee;
-        }}
-        .info-row:last-child {{
+        }
+        .info-row:last-child {
             border-bottom: none;
-        }}
-        .info-label {{
+        }
+        .info-label {
             opacity: 0.6;
             font-size: 14px;
-        }}
-        .info-value {{
+        }
+        .info-value {
             font-weight: 600;
             font-size: 14px;
-        }}
-        .notice-box {{
+        }
+        .notice-box {
             border: 1px solid #ddd;
             padding: 20px;
             text-align: center;
             background: #fafafa;
             margin-top: 16px;
-        }}
-        .notice-box p {{
+        }
+        .notice-box p {
             margin: 0;
             font-size: 13px;
             line-height: 1.6;
-        }}
-    </style>
+        }
+    </style>""")
+
+_ERROR_CSS = _minify_css("""
+    <style>
+        .error-container {
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+        }
+        .error-box {
+            border: 2px solid #000;
+            padding: 32px;
+            text-align: center;
+            background: #fafafa;
+        }
+        .error-icon {
+            font-size: 48px;
+            margin-bottom: 16px;
+        }
+        .error-title {
+            font-size: 20px;
+            font-weight: 600;
+            margin: 0 0 12px 0;
+        }
+        .error-message {
+            margin: 0;
+            font-size: 14px;
+            line-height: 1.6;
+        }
+    </style>""")
+
+
+def booking_node(state: TravelSearchState) -> Dict[str, Any]:
+    """
+    Handle travel package booking with document verification.
+    
+    Flow:
+    1. Check if package is selected
+    2. Verify passport and visa uploads
+    3. Confirm booking or request missing documents
+    
+    Returns only the changed keys; LangGraph merges them into the state.
+    """
+    
+    logger.info(_START_BANNER)
+    
+    thread_id = state.get("thread_id")
+    selected_package_id = state.get("selected_package_id")
+    travel_packages = state.get("travel_packages", [])
+    passport_uploaded = state.get("passport_uploaded", False)
+    visa_uploaded = state.get("visa_uploaded", False)
+    booking_in_progress = state.get("booking_in_progress", False)
+    
+    # DEBUG: Log critical state information
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Thread ID: %s", thread_id)
+        logger.info("Selected Package ID: %s", selected_package_id)
+        logger.info("Travel Packages Count: %d", len(travel_packages))
+        if travel_packages:
+            logger.info("First Package Preview: %s", travel_packages[0].get('package_id', 'N/A'))
+        logger.info("Passport Uploaded: %s", passport_uploaded)
+        logger.info("Visa Uploaded: %s", visa_uploaded)
+        logger.info("Booking In Progress: %s", booking_in_progress)
+        logger.info("State Keys: %s...", list(islice(state, 10)))
+    
+    # Check if we have packages to book
+    if not travel_packages:
+        logger.error("❌ NO TRAVEL PACKAGES FOUND IN STATE!")
+        logger.error("Available state keys: %s", state.keys())
+        return {
+            "booking_error": "No travel packages available for booking",
+            "booking_html": generate_error_html(
+                "You need to search for packages first. search for flights offers first!"
+            ),
+            "current_node": "booking",
+        }
+    
+    # If no package selected yet, show selection interface
+    if not selected_package_id:
+        logger.info("No package selected - showing selection interface")
+        return {
+            "booking_html": generate_package_selection_html(travel_packages),
+            "booking_in_progress": True,
+            "needs_followup": True,
+            "followup_question": "Which package would you like to book? Please specify the package number.",
+            "current_node": "booking",
+        }
+    
+    # Find the selected package (index is built by create_packages; rebuild for older sessions)
+    updates = {"current_node": "booking"}
+    packages_by_id = state.get("travel_packages_by_id")
+    if packages_by_id is None:
+        packages_by_id = {pkg.get("package_id"): pkg for pkg in reversed(travel_packages)}
+        updates["travel_packages_by_id"] = packages_by_id
+    selected_package = packages_by_id.get(selected_package_id)
+    
+    if not selected_package:
+        logger.error("❌ Package %s not found in %d packages", selected_package_id, len(travel_packages))
+        updates.update({
+            "booking_error": f"Package {selected_package_id} not found",
+            "booking_html": generate_error_html(
+                f"Package {selected_package_id} not found. Please select a valid package."
+            ),
+        })
+        return updates
+    
+    updates["selected_package"] = selected_package
+    logger.info("✓ Package %s selected", selected_package_id)
+    
+    # Check document uploads
+    passport_data = state.get("passport_data", [])
+    visa_data = state.get("visa_data", [])
+    passport_total, visa_total = len(passport_data), len(visa_data)
+    
+    logger.info("Document data - Passports: %d, Visas: %d", passport_total, visa_total)
+    
+    # Validate passport data (summary is computed at upload time; scan only for older sessions)
+    passport_valid, passport_count = False, 0
+    if passport_uploaded and passport_total:
+        passport_valid, passport_count = state.get("passport_valid"), state.get("passport_count")
+        if passport_valid is None or passport_count is None:
+            passport_valid, passport_count = summarize_documents(passport_data)
+        logger.info("Passport validation: %s (%d documents)", passport_valid, passport_total)
+    
+    # Validate visa data
+    visa_valid, visa_count = False, 0
+    if visa_uploaded and visa_total:
+        visa_valid, visa_count = state.get("visa_valid"), state.get("visa_count")
+        if visa_valid is None or visa_count is None:
+            visa_valid, visa_count = summarize_documents(visa_data)
+        logger.info("Visa validation: %s (%d documents)", visa_valid, visa_total)
+    
+    logger.info("Final document status - Passport: %s, Visa: %s", passport_valid, visa_valid)
+    
+    # Generate status HTML
+    missing_documents = []
+    if not passport_valid:
+        missing_documents.append("passport")
+    if not visa_valid:
+        missing_documents.append("visa")
+    
+    if missing_documents:
+        logger.info("⚠️ Missing documents: %s", missing_documents)
+        updates.update({
+            "booking_html": generate_document_request_html(
+                selected_package, 
+                passport_valid, 
+                visa_valid,
+                passport_count,
+                visa_count
+            ),
+            "booking_in_progress": True,
+            "needs_followup": True,
+            "followup_question": f"Please upload your {' and '.join(missing_documents)} to continue with the booking.",
+        })
+        return updates
+    
+    # All documents verified - confirm booking
+    logger.info("✅ All documents verified - confirming booking")
+    booking_reference = generate_booking_reference()
+    
+    updates.update({
+        "booking_confirmed": True,
+        "booking_reference": booking_reference,
+        "booking_html": generate_booking_confirmation_html(
+            selected_package,
+            first_valid_document(passport_data),
+            booking_reference
+        ),
+        "booking_in_progress": False,
+        "needs_followup": False,
+    })
+    
+    logger.info("✅ Booking confirmed: %s", booking_reference)
+    logger.info(_BANNER)
+    
+    return updates
+
+
+def summarize_documents(documents: list) -> tuple:
+    """Single pass over uploaded documents. Returns (any valid, number of valid documents)"""
+    valid_count = sum(1 for d in documents if "error" not in d)
+    return valid_count > 0, valid_count
+
+
+def first_valid_document(documents: list) -> Optional[dict]:
+    """First uploaded document that was parsed without error, or None"""
+    return next((d for d in documents if "error" not in d), None)
+
+
+def generate_booking_reference() -> str:
+    """Generate unique booking reference number"""
+    now = datetime.now()
+    return f"BK{now.year:04d}{now.month:02d}{now.day:02d}{secrets.token_hex(4).upper()}"
+
+
+@lru_cache(maxsize=256, typed=True)
+def _render_package_card(pkg_id, is_optimal, duration, checkin, checkout,
+                         flight_price, flight_currency, hotel_price, hotel_currency,
+                         available_hotels, stops) -> str:
+    """Render one package card (cached, the same packages are re-rendered on every selection retry)"""
+    stops_text = "Direct flight" if stops == 0 else f"{stops} stop(s)"
+    data_optimal = int(bool(is_optimal))
+    badge = _OPTIMAL_BADGE[bool(is_optimal)]
+    nights_suffix = _PLURAL_SUFFIX[duration == 1]
+    
+    return f"""
+        <div class="package-card" data-optimal="{data_optimal}">
+            <div class="package-header">
+                <h2 class="package-title">Package {pkg_id}</h2>
+                {badge}
+            </div>
+            
+            <div class="package-grid">
+                <div class="detail-item">
+                    <span class="detail-label">Duration</span>
+                    <span class="detail-value">{duration} night{nights_suffix}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Travel Dates</span>
+                    <span class="detail-value">{checkin} to {checkout}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Flight Price</span>
+                    <span class="detail-value">{flight_price:,.2f} {flight_currency}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Hotels From</span>
+                    <span class="detail-value">{hotel_price:,.2f} {hotel_currency}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Flight Type</span>
+                    <span class="detail-value">{stops_text}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Hotels Available</span>
+                    <span class="detail-value">{available_hotels} options</span>
+                </div>
+            </div>
+        </div>
+        """
+
+
+@lru_cache(maxsize=64)
+def _render_selection_cached(cards: tuple) -> str:
+    """Render the selection page for a packages signature (repeat prompts reuse the HTML)"""
+    return "".join((
+        _SELECTION_CSS,
+        _SELECTION_HEADER,
+        *(_render_package_card(*card) for card in cards),
+        "</div>",
+    ))
+
+
+def generate_package_selection_html(packages: list) -> str:
+    """Generate clean, professional HTML for package selection"""
+    return _render_selection_cached(tuple(pkg.get("card_fields") or package_card_fields(pkg) for pkg in packages))
+
+
+def generate_document_request_html(package: dict, passport_valid: bool, visa_valid: bool, 
+                                   passport_count: int = 0, visa_count: int = 0) -> str:
+    """Generate clean HTML showing selected package and requesting documents"""
+    
+    # Package keys are always set by create_single_package
+    pkg_id = package["package_id"]
+    travel_dates = package["travel_dates"]
+    pricing = package["pricing"]
+    
+    checkin = travel_dates["checkin"]
+    checkout = travel_dates["checkout"]
+    duration = travel_dates["duration_nights"]
+    flight_price = pricing["flight_price"]
+    flight_currency = pricing["flight_currency"]
+    
+    passport_icon = '✓' if passport_valid else '✗'
+    visa_icon = '✓' if visa_valid else '✗'
+    passport_status = f'Verified ({passport_count} document(s))' if passport_valid else 'Not uploaded or invalid'
+    visa_status = f'Verified ({visa_count} document(s))' if visa_valid else 'Not uploaded or invalid'
+    passport_required = '<li><strong>Passport</strong> — Valid travel document required</li>' if not passport_valid else ''
+    visa_required = '<li><strong>Visa</strong> — Valid visa document required</li>' if not visa_valid else ''
+    
+    html = _DOCUMENT_REQUEST_CSS + f"""
+    
+    <div class="booking-container">
+        <div class="section-header">
+            <h1 class="section-title">Package {pkg_id} Selected</h1>
+            <p class="section-subtitle">{duration} nights: {checkin} to {checkout} • Flight: {flight_price:,.2f} {flight_currency}</p>
+        </div>
+        
+        <div class="info-card">
+            <h2 class="card-title">Document Verification Status</h2>
+            
+            <ul class="status-list">
+                <li class="status-item">
+                    <span class="status-icon">{passport_icon}</span>
+                    <div class="status-content">
+                        <p class="status-title">Passport</p>
+                        <p class="status-description">
+                            {passport_status}
+                        </p>
+                    </div>
+                </li>
+                
+                <li class="status-item">
+                    <span class="status-icon">{visa_icon}</span>
+                    <div class="status-content">
+                        <p class="status-title">Visa</p>
+                        <p class="status-description">
+                            {visa_status}
+                        </p>
+                    </div>
+                </li>
+            </ul>
+        </div>
+        
+        <div class="alert-box">
+            <h3 class="alert-title">Action Required</h3>
+            <p class="alert-text">To complete your booking, please upload the following document(s):</p>
+            <ul class="required-list">
+                {passport_required}
+                {visa_required}
+            </ul>
+            <p class="alert-text" style="font-size: 13px; opacity: 0.8; font-style: italic; margin-top: 16px;">
+                Once you upload the required documents, the system will automatically verify them and confirm your booking.
+            </p>
+        </div>
+    </div>
+    """
+    
+    return html
+
+
+def generate_booking_confirmation_html(package: dict, passport: Optional[dict], booking_ref: str) -> str:
+    """Generate clean HTML for booking confirmation"""
+    
+    # Package keys are always set by create_single_package
+    pkg_id = package["package_id"]
+    travel_dates = package["travel_dates"]
+    pricing = package["pricing"]
+    hotels = package["hotels"]
+    
+    checkin = travel_dates["checkin"]
+    checkout = travel_dates["checkout"]
+    duration = travel_dates["duration_nights"]
+    flight_price = pricing["flight_price"]
+    flight_currency = pricing["flight_currency"]
+    hotel_price = hotels["min_price"]
+    hotel_currency = hotels["currency"]
+    
+    # Get traveler info from the verified passport
+    traveler_name = "N/A"
+    passport_number = "N/A"
+    if passport:
+        traveler_name = passport.get("full_name", "N/A")
+        passport_number = passport.get("passport_number", "N/A")
+    
+    nights_suffix = _PLURAL_SUFFIX[duration == 1]
+    
+    html = _CONFIRMATION_CSS + f"""
     
     <div class="booking-container">
         <div class="confirmation-banner">
@@ -630,7 +690,7 @@ def generate_booking_confirmation_html(package: dict, passport_data: list, visa_
             </div>
             <div class="info-row">
                 <span class="info-label">Duration</span>
-                <span class="info-value">{duration} night{'s' if duration != 1 else ''}</span>
+                <span class="info-value">{duration} night{nights_suffix}</span>
             </div>
             <div class="info-row">
                 <span class="info-label">Check-in Date</span>
@@ -666,37 +726,10 @@ def generate_booking_confirmation_html(package: dict, passport_data: list, visa_
     return html
 
 
+@lru_cache(maxsize=64)
 def generate_error_html(message: str) -> str:
-    """Generate clean error HTML"""
-    return f"""
-    <style>
-        .error-container {{
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 20px;
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-        }}
-        .error-box {{
-            border: 2px solid #000;
-            padding: 32px;
-            text-align: center;
-            background: #fafafa;
-        }}
-        .error-icon {{
-            font-size: 48px;
-            margin-bottom: 16px;
-        }}
-        .error-title {{
-            font-size: 20px;
-            font-weight: 600;
-            margin: 0 0 12px 0;
-        }}
-        .error-message {{
-            margin: 0;
-            font-size: 14px;
-            line-height: 1.6;
-        }}
-    </style>
+    """Generate clean error HTML (cached, the same few messages repeat within a session)"""
+    return _ERROR_CSS + f"""
     
     <div class="error-container">
         <div class="error-box">
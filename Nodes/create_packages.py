@@ -1,7 +1,13 @@
-from Models.TravelSearchState import TravelSearchState
-from datetime import datetime
+from Models.TravelSearchState import TravelSearchState, SEARCH_DAYS
+import heapq
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Any
 
+_EMPTY = MappingProxyType({})  # shared read-only default for missing package sections
+_INF = float('inf')  # sort key for hotels without a priced offer
+
 def create_packages(state: TravelSearchState) -> TravelSearchState:
     """Create 3 travel packages and identify the optimal (benchmark) package.
     
@@ -12,20 +18,25 @@ def create_packages(state: TravelSearchState) -> TravelSearchState:
     """
 
     # Get 3 days of flight and hotel data
-    flights_by_day = [state.get(f"flight_offers_day_{i}", []) for i in range(1, 4)]
-    hotels_by_duration = [state.get(f"hotel_offers_duration_{i}", []) for i in range(1, 4)]
-
+    empty_days = [None] * SEARCH_DAYS
+    flights_by_day = state.get("flight_offers_by_day") or empty_days
+    hotels_by_duration = state.get("hotel_offers_by_duration") or empty_days
+    checkin_dates = state.get("checkin_dates") or empty_days
+    checkout_dates = state.get("checkout_dates") or empty_days
+
+    request_type = state.get("request_type", "packages")
+    trip_type = state.get("trip_type", "round_trip")
     packages = []
 
-    for day in range(1, 4):
+    for day in range(1, SEARCH_DAYS + 1):
         package = create_single_package(
             package_id=day,
-            flights=flights_by_day[day-1],
-            hotels=hotels_by_duration[day-1],
-            checkin_date=state.get(f"checkin_date_day_{day}"),
-            checkout_date=state.get(f"checkout_date_day_{day}"),
-            request_type=state.get("request_type", "packages"),
-            trip_type=state.get("trip_type", "round_trip")
+            flights=flights_by_day[day-1] or [],
+            hotels=hotels_by_duration[day-1] or [],
+            checkin_date=checkin_dates[day-1],
+            checkout_date=checkout_dates[day-1],
+            request_type=request_type,
+            trip_type=trip_type
         )
         if package:
             packages.append(package)
@@ -35,6 +46,8 @@ def create_packages(state: TravelSearchState) -> TravelSearchState:
     # ============================================================================
     if packages:
         optimal_package = identify_optimal_package(packages)
+        optimal_flight = (optimal_package.get("pricing") or _EMPTY).get("flight_price", 0)
+        optimal_hotel = (optimal_package.get("hotels") or _EMPTY).get("min_price", 0)
         
         # Mark the optimal package
         for pkg in packages:
@@ -42,14 +55,80 @@ def create_packages(state: TravelSearchState) -> TravelSearchState:
             
             # Calculate savings compared to optimal
             if not pkg["is_optimal"]:
-                pkg["savings_vs_optimal"] = calculate_savings(pkg, optimal_package)
+                pkg["savings_vs_optimal"] = calculate_savings(pkg, optimal_flight, optimal_hotel)
             else:
                 pkg["savings_vs_optimal"] = None
+            
+            # Flattened display fields, reused by the booking selection view
+            pkg["card_fields"] = package_card_fields(pkg)
 
     state["travel_packages"] = packages
+    state["travel_packages_by_id"] = {pkg["package_id"]: pkg for pkg in packages}
     return state
 
 
+def package_card_fields(pkg: Dict[str, Any]) -> tuple:
+    """Flatten a package into the hashable fields shown on its booking selection card"""
+    # Keys below are always set by create_single_package; only the flight part is optional
+    travel_dates = pkg["travel_dates"]
+    pricing = pkg["pricing"]
+    hotels = pkg["hotels"]
+    flight_offer = pkg["flight_offer"] or _EMPTY  # None for hotels-only packages
+    outbound = (flight_offer.get("summary") or _EMPTY).get("outbound") or _EMPTY
+    
+    return (
+        pkg["package_id"],
+        pkg.get("is_optimal", False),
+        travel_dates["duration_nights"],
+        travel_dates["checkin"],
+        travel_dates["checkout"],
+        pricing["flight_price"],
+        pricing["flight_currency"],
+        hotels["min_price"],
+        hotels["currency"],
+        hotels["available_count"],
+        outbound.get("stops", 0),
+    )
+
+
+def package_total_price(pkg: Dict[str, Any]) -> float:
+    """Flight price plus cheapest hotel price (currencies are not converted)"""
+    return (pkg.get("pricing") or _EMPTY).get("flight_price", 0) + (pkg.get("hotels") or _EMPTY).get("min_price", 0)
+
+
+def package_score(pkg: Dict[str, Any]) -> float:
+    """Value score: cheaper flights, direct legs and more available hotels score higher"""
+    score = 0
+    
+    # Price score (lower is better)
+    flight_price = (pkg.get("pricing") or _EMPTY).get("flight_price", 0)
+    
+    # Normalize prices to comparable range (0-100 scale)
+    # Using inverse so lower price = higher score
+    price_score = 100 - min((flight_price / 1000), 100)  # Adjust denominator based on typical prices
+    
+    # Convenience score (direct flights = bonus)
+    flight_offer = pkg.get("flight_offer")
+    if flight_offer:
+        summary = flight_offer.get("summary") or _EMPTY
+        
+        outbound_stops = (summary.get("outbound") or _EMPTY).get("stops", 0)
+        return_stops = (summary.get("return") or _EMPTY).get("stops", 0)
+        
+        # Direct flights get bonus points
+        if outbound_stops == 0:
+            score += 20
+        if return_stops == 0:
+            score += 20
+    
+    # Hotel availability score
+    available_hotels = (pkg.get("hotels") or _EMPTY).get("available_count", 0)
+    hotel_score = min(available_hotels * 2, 20)  # Cap at 20 points
+    
+    # Total score
+    return price_score + score + hotel_score
+
+
 def identify_optimal_package(packages: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Identify the optimal package based on:
@@ -60,81 +139,57 @@ def identify_optimal_package(packages: List[Dict[str, Any]]) -> Dict[str, Any]:
     Returns the package that offers best overall value.
     """
     
-    scored_packages = []
-    
+    # Lowest total price is the primary factor; the score only breaks ties.
+    # One pass keeps the running lowest total and the packages tied at it.
+    lowest = None
+    tied = []
     for pkg in packages:
-        score = 0
-        
-        # Price score (lower is better)
-        flight_price = pkg.get("pricing", {}).get("flight_price", 0)
-        hotel_price = pkg.get("hotels", {}).get("min_price", 0)
-        
-        # Normalize prices to comparable range (0-100 scale)
-        # Using inverse so lower price = higher score
-        price_score = 100 - min((flight_price / 1000), 100)  # Adjust denominator based on typical prices
-        
-        # Convenience score (direct flights = bonus)
-        flight_offer = pkg.get("flight_offer")
-        if flight_offer:
-            summary = flight_offer.get("summary", {})
-            
-            outbound_stops = summary.get("outbound", {}).get("stops", 0)
-            return_stops = summary.get("return", {}).get("stops", 0) if summary.get("return") else 0
-            
-            # Direct flights get bonus points
-            if outbound_stops == 0:
-                score += 20
-            if return_stops == 0:
-                score += 20
-        
-        # Hotel availability score
-        available_hotels = pkg.get("hotels", {}).get("available_count", 0)
-        hotel_score = min(available_hotels * 2, 20)  # Cap at 20 points
-        
-        # Total score
-        total_score = price_score + score + hotel_score
-        
-        scored_packages.append({
-            "package": pkg,
-            "score": total_score,
-            "flight_price": flight_price,
-            "hotel_price": hotel_price,
-            "total_price": flight_price + hotel_price
-        })
-    
-    # Sort by total price first (primary factor), then by score
-    scored_packages.sort(key=lambda x: (x["total_price"], -x["score"]))
+        total = package_total_price(pkg)
+        if lowest is None or total < lowest:
+            lowest = total
+            tied = [pkg]
+        elif total == lowest:
+            tied.append(pkg)
+    if len(tied) == 1:
+        return tied[0]
     
-    return scored_packages[0]["package"]
+    # Highest score among the tied packages (first one wins an exact tie)
+    return max(tied, key=package_score)
 
 
-def calculate_savings(current_package: Dict[str, Any], optimal_package: Dict[str, Any]) -> Dict[str, Any]:
+def calculate_savings(current_package: Dict[str, Any], optimal_flight: float, optimal_hotel: float) -> Dict[str, Any]:
     """
-    Calculate how much MORE the current package costs vs optimal package.
+    Calculate how much MORE the current package costs vs the optimal package's flight and hotel prices.
     Returns savings breakdown (negative = you pay more).
     """
     
-    current_flight = current_package.get("pricing", {}).get("flight_price", 0)
-    optimal_flight = optimal_package.get("pricing", {}).get("flight_price", 0)
+    pricing = current_package.get("pricing") or _EMPTY
+    hotels = current_package.get("hotels") or _EMPTY
     
-    current_hotel = current_package.get("hotels", {}).get("min_price", 0)
-    optimal_hotel = optimal_package.get("hotels", {}).get("min_price", 0)
-    
-    flight_diff = current_flight - optimal_flight
-    hotel_diff = current_hotel - optimal_hotel
+    flight_diff = pricing.get("flight_price", 0) - optimal_flight
+    hotel_diff = hotels.get("min_price", 0) - optimal_hotel
     total_diff = flight_diff + hotel_diff
+    optimal_total = optimal_flight + optimal_hotel
     
     return {
         "flight_difference": flight_diff,
         "hotel_difference": hotel_diff,
         "total_difference": total_diff,
-        "flight_currency": current_package.get("pricing", {}).get("flight_currency", "EGP"),
-        "hotel_currency": current_package.get("hotels", {}).get("currency", "N/A"),
+        "flight_currency": pricing.get("flight_currency", "EGP"),
+        "hotel_currency": hotels.get("currency", "N/A"),
         "is_more_expensive": total_diff > 0,
-        "percentage_more": (total_diff / (optimal_flight + optimal_hotel) * 100) if (optimal_flight + optimal_hotel) > 0 else 0
+        "percentage_more": (total_diff / optimal_total * 100) if optimal_total > 0 else 0
     }
 
 
+@lru_cache(maxsize=256)
+def stay_nights(checkin_date: str, checkout_date: str) -> int:
+    """Nights between two YYYY-MM-DD dates, 0 if either is missing"""
+    if not checkin_date or not checkout_date:
+        return 0
+    return (date.fromisoformat(checkout_date) - date.fromisoformat(checkin_date)).days
+
+
 def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels: List[Dict[str, Any]],
                          checkin_date: str, checkout_date: str, request_type: str = "packages",
                          trip_type: str = "round_trip") -> Dict[str, Any]:
@@ -160,12 +215,11 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
     # ============================================================================
     if request_type == "hotels" or (not flights and checkin_date and checkout_date):
         try:
-            checkin_dt = datetime.strptime(checkin_date, "%Y-%m-%d") if checkin_date else None
-            checkout_dt = datetime.strptime(checkout_date, "%Y-%m-%d") if checkout_date else None
-            duration_nights = (checkout_dt - checkin_dt).days if checkin_dt and checkout_dt else 0
+            duration_nights = stay_nights(checkin_date, checkout_date)
 
             # Process hotels
             api_hotels, company_hotels, total_hotels, available_hotels, min_hotel_price, hotel_currency = process_hotels(hotels)
+            available_count = len(available_hotels)
 
             package = {
                 "package_id": package_id,
@@ -181,7 +235,7 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
                     "api_hotels": api_hotels,
                     "company_hotels": company_hotels,
                     "total_found": total_hotels,
-                    "available_count": len(available_hotels),
+                    "available_count": available_count,
                     "min_price": min_hotel_price,
                     "currency": hotel_currency
                 },
@@ -193,7 +247,7 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
                     "note": "Hotels-only package (no flights)"
                 },
                 "package_summary": f"Package {package_id}: {duration_nights} nights (hotels only), "
-                                  f"{len(available_hotels)} hotels available from {min_hotel_price:,.2f} {hotel_currency}",
+                                  f"{available_count} hotels available from {min_hotel_price:,.2f} {hotel_currency}",
                 "is_optimal": False,
                 "savings_vs_optimal": None
             }
@@ -213,23 +267,24 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
     try:
         # Get flight data
         flight = flights[0] if flights else {}
-        flight_price = float(flight.get("price", {}).get("total", 0)) if flight else 0
-        flight_currency = flight.get("price", {}).get("currency", "EGP") if flight else "EGP"
+        price = flight.get("price") or _EMPTY
+        offer_price = float(price.get("total", 0))
+        flight_price = offer_price if flight else 0
+        flight_currency = price.get("currency", "EGP")
         search_date = flight.get("_search_date", "unknown") if flight else "unknown"
 
         # Calculate duration
-        checkin_dt = datetime.strptime(checkin_date, "%Y-%m-%d") if checkin_date else None
-        checkout_dt = datetime.strptime(checkout_date, "%Y-%m-%d") if checkout_date else None
-        duration_nights = (checkout_dt - checkin_dt).days if checkin_dt and checkout_dt else 0
+        duration_nights = stay_nights(checkin_date, checkout_date)
 
         # Process hotels
         api_hotels, company_hotels, total_hotels, available_hotels, min_hotel_price, hotel_currency = process_hotels(hotels)
+        available_count = len(available_hotels)
 
         # Create flight offer object
         flight_offer = {
             "offer": flight,
-            "price": float(flight.get("price", {}).get("total", 0)),
-            "currency": flight.get("price", {}).get("currency", "EGP"),
+            "price": offer_price,
+            "currency": flight_currency,
             "summary": get_flight_summary(flight, trip_type)
         }
 
@@ -254,7 +309,7 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
                 "api_hotels": api_hotels,
                 "company_hotels": company_hotels,
                 "total_found": total_hotels,
-                "available_count": len(available_hotels),
+                "available_count": available_count,
                 "min_price": min_hotel_price,
                 "currency": hotel_currency
             },
@@ -267,7 +322,7 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
             },
             "package_summary": f"Package {package_id}: {duration_nights} nights ({trip_label}), "
                               f"flight price {flight_price:,.2f} {flight_currency}, "
-                              f"{len(available_hotels)} hotels available from {min_hotel_price:,.2f} {hotel_currency}",
+                              f"{available_count} hotels available from {min_hotel_price:,.2f} {hotel_currency}",
             "is_optimal": False,
             "savings_vs_optimal": None
         }
@@ -279,55 +334,140 @@ def create_single_package(package_id: int, flights: List[Dict[str, Any]], hotels
         return None
 
 
+def get_hotel_offer(hotel: Dict[str, Any]) -> tuple:
+    """(price, currency) of a hotel's best offer; price is inf when it has none"""
+    try:
+        best_offers = hotel.get("best_offers")
+        if best_offers:
+            best_offer = best_offers[0]
+            price = float((best_offer["offer"].get("price") or _EMPTY).get("total", _INF))
+            return price, best_offer.get("currency", "N/A")
+        return _INF, "N/A"
+    except Exception:
+        return _INF, "N/A"
+
+
 def process_hotels(hotels: List[Dict[str, Any]]) -> tuple:
     """Process hotel data and return organized structure.
     
     Returns:
         (api_hotels, company_hotels, total_hotels, available_hotels, min_hotel_price, hotel_currency)
     """
-    api_hotels_list = [h for h in hotels if h.get("source") == "amadeus_api"]
-    company_hotels_list = [h for h in hotels if h.get("source") == "company_excel"]
     total_hotels = len(hotels)
-    available_hotels = [h for h in hotels if h.get("available", True) and h.get("best_offers")]
-
-    def get_hotel_price(hotel):
-        try:
-            if hotel.get("best_offers") and len(hotel["best_offers"]) > 0:
-                return float(hotel["best_offers"][0]["offer"].get("price", {}).get("total", float('inf')))
-            return float('inf')
-        except Exception:
-            return float('inf')
-
-    api_hotels_sorted = sorted(api_hotels_list, key=get_hotel_price)
-    company_hotels_sorted = sorted(company_hotels_list, key=get_hotel_price)
+    api_hotels_list = []
+    company_hotels_list = []
+    available_hotels = []
+    cheapest_hotel = None
+    cheapest_price = _INF
+    cheapest_currency = "N/A"
+    api_available = 0
+    company_available = 0
+    # Each hotel's price is extracted once and looked up by identity afterwards
+    prices = {}
+
+    # Partition by source and availability in one pass
+    for h in hotels:
+        price, currency = get_hotel_offer(h)
+        prices[id(h)] = price
+        source = h.get("source")
+        is_available = h.get("available", True)
+        if source == "amadeus_api":
+            api_hotels_list.append(h)
+            if is_available:
+                api_available += 1
+        elif source == "company_excel":
+            company_hotels_list.append(h)
+            if is_available:
+                company_available += 1
+        if is_available and h.get("best_offers"):
+            available_hotels.append(h)
+            # Keep the first cheapest, as min() would
+            if cheapest_hotel is None or price < cheapest_price:
+                cheapest_hotel = h
+                cheapest_price = price
+                cheapest_currency = currency
+
+    def price_of(hotel):
+        return prices[id(hotel)]
+
+    # Only the five cheapest of each source are kept; the first is the source's min price
+    api_hotels_sorted = heapq.nsmallest(5, api_hotels_list, key=price_of)
+    company_hotels_sorted = heapq.nsmallest(5, company_hotels_list, key=price_of)
 
     min_hotel_price = 0
     hotel_currency = "N/A"
-    if available_hotels:
-        cheapest_hotel = min(available_hotels, key=get_hotel_price)
-        if cheapest_hotel.get("best_offers"):
-            min_hotel_price = float(cheapest_hotel["best_offers"][0]["offer"].get("price", {}).get("total", 0))
-            hotel_currency = cheapest_hotel["best_offers"][0].get("currency", "N/A")
+    if cheapest_hotel is not None:
+        # An offer without a usable total is priced inf for ranking but reported as 0
+        min_hotel_price = cheapest_price if cheapest_price != _INF else 0.0
+        hotel_currency = cheapest_currency
 
     api_hotels = {
         "total_found": len(api_hotels_list),
-        "available_count": len([h for h in api_hotels_list if h.get("available", True)]),
-        "top_options": api_hotels_sorted[:5],
-        "min_price": min([get_hotel_price(h) for h in api_hotels_list] or [0]),
+        "available_count": api_available,
+        "top_options": api_hotels_sorted,
+        "min_price": price_of(api_hotels_sorted[0]) if api_hotels_sorted else 0,
         "currency": hotel_currency if api_hotels_list else "N/A"
     }
 
     company_hotels = {
         "total_found": len(company_hotels_list),
-        "available_count": len([h for h in company_hotels_list if h.get("available", True)]),
-        "top_options": company_hotels_sorted[:5],
-        "min_price": min([get_hotel_price(h) for h in company_hotels_list] or [0]),
+        "available_count": company_available,
+        "top_options": company_hotels_sorted,
+        "min_price": price_of(company_hotels_sorted[0]) if company_hotels_sorted else 0,
         "currency": hotel_currency if company_hotels_list else "N/A"
     }
 
     return api_hotels, company_hotels, total_hotels, available_hotels, min_hotel_price, hotel_currency
 
 
+def get_segment_detail(segment: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-segment flight details used in a flight summary leg"""
+    departure = segment.get("departure") or _EMPTY
+    arrival = segment.get("arrival") or _EMPTY
+    return {
+        "carrierCode": segment.get("carrierCode", ""),
+        "number": segment.get("number", ""),
+        "aircraft": {
+            "code": (segment.get("aircraft") or _EMPTY).get("code", "")
+        },
+        "operating": {
+            "carrierCode": (segment.get("operating") or _EMPTY).get("carrierCode", "")
+        },
+        "departure": {
+            "airport": departure.get("iataCode", ""),
+            "time": departure.get("at", ""),
+            "terminal": departure.get("terminal", "")
+        },
+        "arrival": {
+            "airport": arrival.get("iataCode", ""),
+            "time": arrival.get("at", ""),
+            "terminal": arrival.get("terminal", "")
+        },
+        "duration": segment.get("duration", "")
+    }
+
+
+def get_leg_summary(itinerary: Dict[str, Any], segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize one itinerary leg: first departure, last arrival, stops and segment details"""
+    departure = segments[0].get("departure") or _EMPTY
+    arrival = segments[-1].get("arrival") or _EMPTY
+    return {
+        "departure": {
+            "airport": departure.get("iataCode", ""),
+            "time": departure.get("at", ""),
+            "terminal": departure.get("terminal", "")
+        },
+        "arrival": {
+            "airport": arrival.get("iataCode", ""),
+            "time": arrival.get("at", ""),
+            "terminal": arrival.get("terminal", "")
+        },
+        "duration": itinerary.get("duration", ""),
+        "stops": len(segments) - 1,
+        "flight_details": [get_segment_detail(segment) for segment in segments]
+    }
+
+
 def get_flight_summary(flight: Dict[str, Any], trip_type: str = "round_trip") -> Dict[str, Any]:
     """Create a summary of flight information with enhanced details.
     
@@ -351,104 +491,18 @@ def get_flight_summary(flight: Dict[str, Any], trip_type: str = "round_trip") ->
         # OUTBOUND FLIGHT
         outbound = itineraries[0]
         outbound_segments = outbound.get("segments", [])
-
         if outbound_segments:
-            first_segment = outbound_segments[0]
-            last_segment = outbound_segments[-1]
-
-            outbound_flight_details = []
-            for segment in outbound_segments:
-                flight_detail = {
-                    "carrierCode": segment.get("carrierCode", ""),
-                    "number": segment.get("number", ""),
-                    "aircraft": {
-                        "code": segment.get("aircraft", {}).get("code", "")
-                    },
-                    "operating": {
-                        "carrierCode": segment.get("operating", {}).get("carrierCode", "")
-                    },
-                    "departure": {
-                        "airport": segment.get("departure", {}).get("iataCode", ""),
-                        "time": segment.get("departure", {}).get("at", ""),
-                        "terminal": segment.get("departure", {}).get("terminal", "")
-                    },
-                    "arrival": {
-                        "airport": segment.get("arrival", {}).get("iataCode", ""),
-                        "time": segment.get("arrival", {}).get("at", ""),
-                        "terminal": segment.get("arrival", {}).get("terminal", "")
-                    },
-                    "duration": segment.get("duration", "")
-                }
-                outbound_flight_details.append(flight_detail)
-
-            summary["outbound"] = {
-                "departure": {
-                    "airport": first_segment.get("departure", {}).get("iataCode", ""),
-                    "time": first_segment.get("departure", {}).get("at", ""),
-                    "terminal": first_segment.get("departure", {}).get("terminal", "")
-                },
-                "arrival": {
-                    "airport": last_segment.get("arrival", {}).get("iataCode", ""),
-                    "time": last_segment.get("arrival", {}).get("at", ""),
-                    "terminal": last_segment.get("arrival", {}).get("terminal", "")
-                },
-                "duration": outbound.get("duration", ""),
-                "stops": len(outbound_segments) - 1,
-                "flight_details": outbound_flight_details
-            }
+            summary["outbound"] = get_leg_summary(outbound, outbound_segments)
 
         # RETURN FLIGHT (only for round trip)
         if trip_type == "round_trip" and len(itineraries) > 1:
             return_itinerary = itineraries[1]
             return_segments = return_itinerary.get("segments", [])
-
             if return_segments:
-                first_return = return_segments[0]
-                last_return = return_segments[-1]
-
-                return_flight_details = []
-                for segment in return_segments:
-                    flight_detail = {
-                        "carrierCode": segment.get("carrierCode", ""),
-                        "number": segment.get("number", ""),
-                        "aircraft": {
-                            "code": segment.get("aircraft", {}).get("code", "")
-                        },
-                        "operating": {
-                            "carrierCode": segment.get("operating", {}).get("carrierCode", "")
-                        },
-                        "departure": {
-                            "airport": segment.get("departure", {}).get("iataCode", ""),
-                            "time": segment.get("departure", {}).get("at", ""),
-                            "terminal": segment.get("departure", {}).get("terminal", "")
-                        },
-                        "arrival": {
-                            "airport": segment.get("arrival", {}).get("iataCode", ""),
-                            "time": segment.get("arrival", {}).get("at", ""),
-                            "terminal": segment.get("arrival", {}).get("terminal", "")
-                        },
-                        "duration": segment.get("duration", "")
-                    }
-                    return_flight_details.append(flight_detail)
-
-                summary["return"] = {
-                    "departure": {
-                        "airport": first_return.get("departure", {}).get("iataCode", ""),
-                        "time": first_return.get("departure", {}).get("at", ""),
-                        "terminal": first_return.get("departure", {}).get("terminal", "")
-                    },
-                    "arrival": {
-                        "airport": last_return.get("arrival", {}).get("iataCode", ""),
-                        "time": last_return.get("arrival", {}).get("at", ""),
-                        "terminal": last_return.get("arrival", {}).get("terminal", "")
-                    },
-                    "duration": return_itinerary.get("duration", ""),
-                    "stops": len(return_segments) - 1,
-                    "flight_details": return_flight_details
-                }
+                summary["return"] = get_leg_summary(return_itinerary, return_segments)
 
         return summary
 
     except Exception as e:
         print(f"Error creating flight summary: {e}")
-        return {"error": "Failed to create summary"}
\ No newline at end of file
+        return {"error": "Failed to create summary"}
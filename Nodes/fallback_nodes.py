@@ -9,7 +9,7 @@ PRIORITY:
 4. Emergency fallback
 """
 
-from Models.TravelSearchState import TravelSearchState
+from Models.TravelSearchState import TravelSearchState, SEARCH_DAYS
 import json
 from datetime import datetime, timedelta
 import os
@@ -58,6 +58,9 @@ def get_flight_offers_node_with_fallback(state: TravelSearchState) -> TravelSear
     print(f"Date: {departure_date}, Duration: {duration}, Cabin: {cabin}")
     
     data_found = False
+    flight_offers_by_day = [[] for _ in range(SEARCH_DAYS)]
+    checkin_dates = [None] * SEARCH_DAYS
+    checkout_dates = [None] * SEARCH_DAYS
     
     # LAYER 1: Database (exact or adjusted dates)
     if FALLBACK_AVAILABLE:
@@ -74,9 +77,9 @@ def get_flight_offers_node_with_fallback(state: TravelSearchState) -> TravelSear
             
             if flights_by_day:
                 # Store each day separately
-                for day_num in range(1, 4):
+                for day_num in range(1, SEARCH_DAYS + 1):
                     day_flights = flights_by_day.get(day_num, [])
-                    state[f"flight_offers_day_{day_num}"] = day_flights
+                    flight_offers_by_day[day_num - 1] = day_flights
                     
                     # Extract hotel dates
                     if day_flights:
@@ -84,11 +87,11 @@ def get_flight_offers_node_with_fallback(state: TravelSearchState) -> TravelSear
                             day_flights[0], duration, day_num
                         )
                         if checkin and checkout:
-                            state[f"checkin_date_day_{day_num}"] = checkin
-                            state[f"checkout_date_day_{day_num}"] = checkout
+                            checkin_dates[day_num - 1] = checkin
+                            checkout_dates[day_num - 1] = checkout
                             print(f"  ✓ Day {day_num}: {len(day_flights)} flights, hotel dates {checkin} → {checkout}")
                 
-                total_flights = sum(len(flights_by_day.get(i, [])) for i in range(1, 4))
+                total_flights = sum(len(flights_by_day.get(i, [])) for i in range(1, SEARCH_DAYS + 1))
                 print(f"✓ Database: Retrieved {total_flights} flights total")
                 data_found = True
             else:
@@ -120,7 +123,7 @@ def get_flight_offers_node_with_fallback(state: TravelSearchState) -> TravelSear
                 f["_day_number"] = 1
                 f["_from_llm"] = True
 
-            state["flight_offers_day_1"] = day1_flights
+            flight_offers_by_day[0] = day1_flights
 
             # === CLONE + TWEAK FOR DAYS 2 & 3 ===
             import random
@@ -163,7 +166,7 @@ def get_flight_offers_node_with_fallback(state: TravelSearchState) -> TravelSear
                     clone["_cloned_from_day_1"] = True
                     cloned_flights.append(clone)
 
-                state[f"flight_offers_day_{day_num}"] = cloned_flights
+                flight_offers_by_day[day_num - 1] = cloned_flights
 
                 # Extract hotel dates from first cloned flight
                 if cloned_flights:
@@ -171,8 +174,8 @@ def get_flight_offers_node_with_fallback(state: TravelSearchState) -> TravelSear
                         cloned_flights[0], duration, day_num
                     )
                     if checkin and checkout:
-                        state[f"checkin_date_day_{day_num}"] = checkin
-                        state[f"checkout_date_day_{day_num}"] = checkout
+                        checkin_dates[day_num - 1] = checkin
+                        checkout_dates[day_num - 1] = checkout
                         print(f"  ✓ Day {day_num}: cloned {len(cloned_flights)} flights, dates {checkin} → {checkout}")
 
             data_found = True
@@ -185,7 +188,7 @@ def get_flight_offers_node_with_fallback(state: TravelSearchState) -> TravelSear
         
         start_date = datetime.strptime(departure_date, "%Y-%m-%d").date()
         
-        for day_offset in range(3):
+        for day_offset in range(SEARCH_DAYS):
             day_num = day_offset + 1
             query_date = (start_date + timedelta(days=day_offset)).strftime("%Y-%m-%d")
             
@@ -203,24 +206,24 @@ def get_flight_offers_node_with_fallback(state: TravelSearchState) -> TravelSear
                 flight["_day_number"] = day_num
                 flights.append(flight)
             
-            state[f"flight_offers_day_{day_num}"] = flights
+            flight_offers_by_day[day_num - 1] = flights
             
             checkin, checkout = extract_hotel_dates_from_flight(
                 flights[0], duration, day_num
             )
             if checkin and checkout:
-                state[f"checkin_date_day_{day_num}"] = checkin
-                state[f"checkout_date_day_{day_num}"] = checkout
+                checkin_dates[day_num - 1] = checkin
+                checkout_dates[day_num - 1] = checkout
                 print(f"  ✓ Day {day_num}: {len(flights)} flights, dates {checkin} → {checkout}")
         
         print("✓ Emergency: Generated basic fallback data")
     
+    state["flight_offers_by_day"] = flight_offers_by_day
+    state["checkin_dates"] = checkin_dates
+    state["checkout_dates"] = checkout_dates
+    
     # Compile results
-    all_results = []
-    for i in range(1, 4):
-        day_key = f"flight_offers_day_{i}"
-        if day_key in state:
-            all_results.extend(state[day_key])
+    all_results = [f for flights in flight_offers_by_day for f in flights]
     
     state["result"] = {"data": all_results}
     
@@ -296,13 +299,16 @@ def get_hotel_offers_node_with_fallback(state: TravelSearchState) -> TravelSearc
         else:
             print(f"✗ City {city_code} NOT in database → Will use LLM if needed")
 
+    checkin_dates = state.get("checkin_dates") or [None] * SEARCH_DAYS
+    checkout_dates = state.get("checkout_dates") or [None] * SEARCH_DAYS
+    hotel_offers_by_duration = [[] for _ in range(SEARCH_DAYS)]
+
     # Process 3 days
-    for day in range(1, 4):
-        checkin = state.get(f"checkin_date_day_{day}")
-        checkout = state.get(f"checkout_date_day_{day}")
+    for day in range(1, SEARCH_DAYS + 1):
+        checkin = checkin_dates[day - 1]
+        checkout = checkout_dates[day - 1]
 
         if not checkin or not checkout:
-            state[f"hotel_offers_duration_{day}"] = []
             print(f"  - Day {day}: missing checkin/checkout → skipping")
             continue
 
@@ -325,7 +331,7 @@ def get_hotel_offers_node_with_fallback(state: TravelSearchState) -> TravelSearc
 
                 if db_hotels:
                     processed = process_hotel_offers(db_hotels, source="amadeus_api")
-                    state[f"hotel_offers_duration_{day}"] = processed
+                    hotel_offers_by_duration[day - 1] = processed
                     data_found = True
 
                     # Printer diagnostics: check tags on first hotel
@@ -348,7 +354,7 @@ def get_hotel_offers_node_with_fallback(state: TravelSearchState) -> TravelSearc
                     if db_hotels_any:
                         processed = process_hotel_offers(db_hotels_any, source="amadeus_api")
                         # Adjust dates per requested range using DB service helper if needed
-                        state[f"hotel_offers_duration_{day}"] = processed
+                        hotel_offers_by_duration[day - 1] = processed
                         data_found = True
                         print(f"  ✓ Database (ANY-dates): {len(db_hotels_any)} hotels used and adjusted to requested dates")
                     else:
@@ -361,8 +367,8 @@ def get_hotel_offers_node_with_fallback(state: TravelSearchState) -> TravelSearc
         if not data_found and LLM_GEN_AVAILABLE and not city_exists_in_db:
             print(f"  [Layer 2] City not in DB → Generating Day 1 via LLM (cloning for Days 2-3)...")
 
-            checkin_d1 = state.get("checkin_date_day_1")
-            checkout_d1 = state.get("checkout_date_day_1")
+            checkin_d1 = checkin_dates[0]
+            checkout_d1 = checkout_dates[0]
             if checkin_d1 and checkout_d1:
                 day1_hotels = llm_generator.generate_hotel_offers(
                     city_code=city_code,
@@ -370,16 +376,16 @@ def get_hotel_offers_node_with_fallback(state: TravelSearchState) -> TravelSearc
                     checkout_date=checkout_d1,
                     num_offers=5
                 )
-                state["hotel_offers_duration_1"] = process_hotel_offers(day1_hotels, source="llm")
+                hotel_offers_by_duration[0] = process_hotel_offers(day1_hotels, source="llm")
                 print(f"  ✓ LLM: Day 1 – {len(day1_hotels)} hotels generated")
 
                 # Clone for Days 2 & 3
                 import random
-                for day2 in [2, 3]:
-                    checkin_d = state.get(f"checkin_date_day_{day2}")
-                    checkout_d = state.get(f"checkout_date_day_{day2}")
+                for day2 in range(2, SEARCH_DAYS + 1):
+                    checkin_d = checkin_dates[day2 - 1]
+                    checkout_d = checkout_dates[day2 - 1]
                     if not checkin_d or not checkout_d:
-                        state[f"hotel_offers_duration_{day2}"] = []
+                        hotel_offers_by_duration[day2 - 1] = []
                         continue
 
                     cloned_hotels = []
@@ -406,7 +412,7 @@ def get_hotel_offers_node_with_fallback(state: TravelSearchState) -> TravelSearc
                         clone["_cloned_from_day_1"] = True
                         cloned_hotels.append(clone)
 
-                    state[f"hotel_offers_duration_{day2}"] = process_hotel_offers(cloned_hotels, source="llm")
+                    hotel_offers_by_duration[day2 - 1] = process_hotel_offers(cloned_hotels, source="llm")
                     print(f"  ✓ Cloned Day {day2}: {len(cloned_hotels)} hotels")
 
                 data_found = True
@@ -423,7 +429,7 @@ def get_hotel_offers_node_with_fallback(state: TravelSearchState) -> TravelSearc
             )
 
             processed = process_hotel_offers(dummy_hotels, source="emergency")
-            state[f"hotel_offers_duration_{day}"] = processed
+            hotel_offers_by_duration[day - 1] = processed
             print(f"  ✓ Emergency: {len(dummy_hotels)} hotels generated")
 
         # Add company hotels (same as API node)
@@ -463,19 +469,19 @@ def get_hotel_offers_node_with_fallback(state: TravelSearchState) -> TravelSearc
                             }],
                             "source": "company_excel"
                         }
-                        current_offers = state.get(f"hotel_offers_duration_{day}", [])
-                        current_offers.append(company_hotel)
-                        state[f"hotel_offers_duration_{day}"] = current_offers
+                        hotel_offers_by_duration[day - 1].append(company_hotel)
                         added += 1
 
                     if added:
                         print(f"  ✓ Added {added} company hotels")
 
+    state["hotel_offers_by_duration"] = hotel_offers_by_duration
+
     # Set legacy key for compatibility
-    state["hotel_offers"] = state.get("hotel_offers_duration_1", [])
+    state["hotel_offers"] = hotel_offers_by_duration[0]
 
     print(f"\n{'='*60}")
-    print(f"State keys created: hotel_offers_duration_1, hotel_offers_duration_2, hotel_offers_duration_3")
+    print(f"State key created: hotel_offers_by_duration ({SEARCH_DAYS} days)")
     print(f"{'='*60}\n")
 
     return state
@@ -557,8 +563,8 @@ def extract_hotel_dates_from_flight(flight_offer, duration, day_number):
         if not outbound_arrival_iso:
             return None, None
 
-        checkin_datetime = datetime.fromisoformat(outbound_arrival_iso.replace("Z", "+00:00"))
-        checkin_date = checkin_datetime.date().strftime("%Y-%m-%d")
+        # Amadeus timestamps are ISO 8601, so the date is the first 10 characters
+        checkin_date = outbound_arrival_iso[:10]
 
         checkout_date = None
 
@@ -568,11 +574,10 @@ def extract_hotel_dates_from_flight(flight_offer, duration, day_number):
                 first_return_segment = return_segments[0]
                 return_departure_iso = first_return_segment.get("departure", {}).get("at")
                 if return_departure_iso:
-                    checkout_datetime = datetime.fromisoformat(return_departure_iso.replace("Z", "+00:00"))
-                    checkout_date = checkout_datetime.date().strftime("%Y-%m-%d")
+                    checkout_date = return_departure_iso[:10]
 
         if not checkout_date and duration:
-            checkout_date = (checkin_datetime.date() + timedelta(days=int(duration))).strftime("%Y-%m-%d")
+            checkout_date = (datetime.fromisoformat(checkin_date) + timedelta(days=int(duration))).strftime("%Y-%m-%d")
 
         return checkin_date, checkout_date
 
@@ -1,4 +1,4 @@
-from Models.TravelSearchState import TravelSearchState
+from Models.TravelSearchState import TravelSearchState, SEARCH_DAYS
 import requests
 import json
 from datetime import datetime, timedelta
@@ -17,8 +17,7 @@ def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
         print("Skipping flight search, setting up hotel dates only")
         
         # Set empty flight results for all days
-        for i in range(1, 4):
-            state[f"flight_offers_day_{i}"] = []
+        state["flight_offers_by_day"] = [[] for _ in range(SEARCH_DAYS)]
         
         # For hotels-only, use departure date as checkin for 3 consecutive days
         start_date_str = state.get("normalized_departure_date")
@@ -28,16 +27,18 @@ def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
         print(f"Base checkin date: {start_date}")
         print(f"Duration: {duration} nights")
         
-        for day_offset in range(0, 3):
+        checkin_dates = []
+        checkout_dates = []
+        for day_offset in range(0, SEARCH_DAYS):
             checkin_date = (start_date + timedelta(days=day_offset)).strftime("%Y-%m-%d")
             checkout_date = (start_date + timedelta(days=day_offset + duration)).strftime("%Y-%m-%d")
+            checkin_dates.append(checkin_date)
+            checkout_dates.append(checkout_date)
             
-            day_number = day_offset + 1
-            state[f"checkin_date_day_{day_number}"] = checkin_date
-            state[f"checkout_date_day_{day_number}"] = checkout_date
-            
-            print(f"Day {day_number}: CHECK-IN {checkin_date} → CHECK-OUT {checkout_date}")
+            print(f"Day {day_offset + 1}: CHECK-IN {checkin_date} → CHECK-OUT {checkout_date}")
         
+        state["checkin_dates"] = checkin_dates
+        state["checkout_dates"] = checkout_dates
         state["result"] = {"data": []}
         return state
     
@@ -63,7 +64,7 @@ def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
 
     # Prepare requests for 3 consecutive days
     bodies = []
-    for day_offset in range(0, 3):
+    for day_offset in range(0, SEARCH_DAYS):
         query_date = (start_date + timedelta(days=day_offset)).strftime("%Y-%m-%d")
         body = copy.deepcopy(base_body)
         print(f"Preparing search for day {day_offset + 1}: {query_date}")
@@ -82,6 +83,10 @@ def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
         body["searchCriteria"]["maxFlightOffers"] = 1
         bodies.append((day_offset + 1, query_date, body))
 
+    flight_offers_by_day = [[] for _ in range(SEARCH_DAYS)]
+    checkin_dates = [None] * SEARCH_DAYS
+    checkout_dates = [None] * SEARCH_DAYS
+
     # Sequential search across 3 days
     for day_number, search_date, body in bodies:
         print(f"\n--- SEARCHING DAY {day_number} ({search_date}) ---")
@@ -101,7 +106,7 @@ def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
                 f["_search_date"] = search_date
                 f["_day_number"] = day_number
 
-            state[f"flight_offers_day_{day_number}"] = flights
+            flight_offers_by_day[day_number - 1] = flights
 
             if flights:
                 flight = flights[0]
@@ -120,8 +125,8 @@ def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
                 )
 
                 if checkin_date and checkout_date:
-                    state[f"checkin_date_day_{day_number}"] = checkin_date
-                    state[f"checkout_date_day_{day_number}"] = checkout_date
+                    checkin_dates[day_number - 1] = checkin_date
+                    checkout_dates[day_number - 1] = checkout_date
                     print(f"✓ Day {day_number} hotel dates: CHECK-IN {checkin_date} → CHECK-OUT {checkout_date}")
                 else:
                     print(f"✗ Failed to extract hotel dates for day {day_number}")
@@ -131,12 +136,12 @@ def get_flight_offers_node(state: TravelSearchState) -> TravelSearchState:
         except Exception as exc:
             print(f"Unexpected error getting flight offers for day {day_number}: {exc}")
 
+    state["flight_offers_by_day"] = flight_offers_by_day
+    state["checkin_dates"] = checkin_dates
+    state["checkout_dates"] = checkout_dates
+
     # Keep legacy format for compatibility
-    all_results = []
-    for i in range(1, 4):
-        day_key = f"flight_offers_day_{i}"
-        if day_key in state:
-            all_results.extend(state[day_key])
+    all_results = [f for flights in flight_offers_by_day for f in flights]
     state["result"] = {"data": all_results}
 
     print(f"\nTotal flights found across all days: {len(all_results)}")
@@ -174,8 +179,8 @@ def extract_hotel_dates_from_flight(flight_offer, duration, day_number, trip_typ
             print(f"No arrival time found in outbound segment")
             return None, None
 
-        checkin_datetime = datetime.fromisoformat(outbound_arrival_iso.replace("Z", "+00:00"))
-        checkin_date = checkin_datetime.date().strftime("%Y-%m-%d")
+        # Amadeus timestamps are ISO 8601, so the date is the first 10 characters
+        checkin_date = outbound_arrival_iso[:10]
 
         checkout_date = None
         
@@ -186,8 +191,7 @@ def extract_hotel_dates_from_flight(flight_offer, duration, day_number, trip_typ
                 first_return_segment = return_segments[0]
                 return_departure_iso = first_return_segment.get("departure", {}).get("at")
                 if return_departure_iso:
-                    checkout_datetime = datetime.fromisoformat(return_departure_iso.replace("Z", "+00:00"))
-                    checkout_date = checkout_datetime.date().strftime("%Y-%m-%d")
+                    checkout_date = return_departure_iso[:10]
                     print(f"Round trip: Using return flight departure as checkout")
 
         # Fallback: use duration to calculate checkout (works for both one-way and round trip)
@@ -199,7 +203,7 @@ def extract_hotel_dates_from_flight(flight_offer, duration, day_number, trip_typ
                 print(f"Invalid duration value: {duration}, using 3 days")
                 duration_days = 3
             
-            checkout_date = (checkin_datetime.date() + timedelta(days=duration_days)).strftime("%Y-%m-%d")
+            checkout_date = (datetime.fromisoformat(checkin_date) + timedelta(days=duration_days)).strftime("%Y-%m-%d")
             print(f"Using duration-based checkout: {duration_days} days from arrival")
 
         return checkin_date, checkout_date
@@ -1,4 +1,4 @@
-from Models.TravelSearchState import TravelSearchState
+from Models.TravelSearchState import TravelSearchState, SEARCH_DAYS
 import requests
 from collections import defaultdict
 import time
@@ -28,18 +28,14 @@ def get_hotel_offers_node(state: TravelSearchState) -> TravelSearchState:
     # If we have neither Amadeus hotels nor company hotels, return empty
     if not hotel_ids and not state.get("company_hotels"):
         print("WARNING: No hotel sources available (neither Amadeus nor company hotels)")
-        for day in range(1, 4):  # Changed from 8 to 4 to match your 3-day search
-            state[f"hotel_offers_duration_{day}"] = []
+        state["hotel_offers_by_duration"] = [[] for _ in range(SEARCH_DAYS)]
         return state
 
     # Prepare hotel search for 3 days (matching your flight search)
     duration_requests = []
-    for day in range(1, 4):  # Changed from 8 to 4
-        checkin_key = f"checkin_date_day_{day}"
-        checkout_key = f"checkout_date_day_{day}"
-        checkin = state.get(checkin_key)
-        checkout = state.get(checkout_key)
-        
+    checkin_dates = state.get("checkin_dates") or [None] * SEARCH_DAYS
+    checkout_dates = state.get("checkout_dates") or [None] * SEARCH_DAYS
+    for day, (checkin, checkout) in enumerate(zip(checkin_dates, checkout_dates), 1):
         if checkin and checkout:
             duration_requests.append({
                 "duration_number": day,
@@ -191,13 +187,15 @@ def get_hotel_offers_node(state: TravelSearchState) -> TravelSearchState:
         return processed
 
     # Execute searches for all durations
+    hotel_offers_by_duration = [[] for _ in range(SEARCH_DAYS)]
     for duration_info in duration_requests:
         duration_number, offers = fetch_hotels_for_duration(duration_info)
-        state[f"hotel_offers_duration_{duration_number}"] = offers
+        hotel_offers_by_duration[duration_number - 1] = offers
         time.sleep(0.5)  # Small delay to avoid rate limits
+    state["hotel_offers_by_duration"] = hotel_offers_by_duration
 
     # Set the first day's offers as default
-    state["hotel_offers"] = state.get("hotel_offers_duration_1", [])
+    state["hotel_offers"] = hotel_offers_by_duration[0]
     
     print(f"\n✓ Hotel search completed")
     print(f"Total packages created: {len(duration_requests)}")
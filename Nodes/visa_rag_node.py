@@ -1,17 +1,22 @@
-        
-from typing import Optional, List, Dict
+from __future__ import annotations
+
+from typing import Optional, List, Dict, Mapping, TYPE_CHECKING
 from pathlib import Path
-from langchain_community.vectorstores import FAISS
-from sentence_transformers import SentenceTransformer
-from langchain_core.documents import Document
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from Models.TravelSearchState import TravelSearchState
 from Utils.watson_config import llm
+from Utils.script_patterns import ARABIC_RE, LATIN_RE
 from dotenv import load_dotenv
 import json
 import re
 import logging
 from difflib import get_close_matches
+from functools import lru_cache
+from types import MappingProxyType
+
+if TYPE_CHECKING:
+    # langchain/torch are heavy; imported lazily where the RAG actually runs
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
 
 load_dotenv('.env')
 
@@ -26,34 +31,80 @@ class VisaRAGConfig:
     country_mapping_file: str = "data/country_mapping.json"
     llm_model: str = "llama-3.3-70b-instruct"
 
+_EMPTY_MAPPING = MappingProxyType({})
+
+@lru_cache(maxsize=None)
+def _read_country_mapping(mapping_path: str) -> Mapping:
+    """Read the country mapping persisted by build_vector_store. Raises on failure so only successful loads are cached."""
+    mapping_file = Path(mapping_path)
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+    if not mapping:
+        raise ValueError(f"Country mapping at {mapping_file} is empty")
+    logger.info(f"Loaded mapping for {len(mapping)} countries")
+    return MappingProxyType(mapping)
+
+def load_country_mapping(mapping_path: str) -> Mapping:
+    """Load the country mapping once per process; a missing or broken file is retried on the next call"""
+    try:
+        return _read_country_mapping(mapping_path)
+    except FileNotFoundError:
+        logger.error(f"Country mapping file not found at {mapping_path}")
+    except Exception as e:
+        logger.error(f"Error loading country mapping: {e}")
+    return _EMPTY_MAPPING
+
+@lru_cache(maxsize=None)
+def _read_available_countries(mapping_path: str) -> tuple:
+    """Cached country list; raises like _read_country_mapping so failures are not cached"""
+    mapping = _read_country_mapping(mapping_path)
+    return tuple((info['display_name'], info['display_name'].lower()) for info in mapping.values())
+
+def load_available_countries(mapping_path: str) -> tuple:
+    """(display_name, lowercased) pairs in mapping order, used to validate LLM country answers"""
+    try:
+        return _read_available_countries(mapping_path)
+    except Exception as e:
+        logger.error(f"Country list unavailable: {e}")
+        return ()
+
 class CountrySpecificVisaRAG:
     """Enhanced RAG system with metadata filtering and bilingual support"""
     
     def __init__(self, config: VisaRAGConfig):
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        
         self.config = config
         self.embeddings = HuggingFaceEmbeddings(
             model_name=config.embeddings_model,
             model_kwargs={'device': 'cpu'}
         )
-        self.country_mapping = self._load_country_mapping()
         self._loaded_stores = {}
+        self.refresh_country_mapping()
     
-    def _load_country_mapping(self) -> Dict:
+    def _load_country_mapping(self) -> Mapping:
         """Load the country mapping file"""
-        mapping_file = Path(self.config.country_mapping_file)
-        
-        if not mapping_file.exists():
-            logger.error(f"Country mapping file not found at {mapping_file}")
-            return {}
-        
-        try:
-            with open(mapping_file, 'r', encoding='utf-8') as f:
-                mapping = json.load(f)
-            logger.info(f"Loaded mapping for {len(mapping)} countries")
-            return mapping
-        except Exception as e:
-            logger.error(f"Error loading country mapping: {e}")
-            return {}
+        return load_country_mapping(self.config.country_mapping_file)
+    
+    def refresh_country_mapping(self):
+        """(Re)load the country mapping and rebuild the query index from it"""
+        self.country_mapping = self._load_country_mapping()
+        self._build_country_index()
+    
+    def _build_country_index(self):
+        """Precompile a single regex over all display names for query scanning"""
+        self._display_to_key = {
+            info['display_name'].lower(): key for key, info in self.country_mapping.items()
+        }
+        if not self._display_to_key:
+            self._country_re = None
+            return
+        # Intentionally stricter than a plain substring test: a name only matches as a whole
+        # word, and the leftmost (then longest) name in the query wins rather than the first in
+        # mapping order. Lookarounds instead of \b so names that begin or end with punctuation,
+        # e.g. "(...)" or "St.", still match. Longest names first so "South Sudan" beats "Sudan".
+        alternatives = sorted(map(re.escape, self._display_to_key), key=len, reverse=True)
+        self._country_re = re.compile(r'(?<!\w)(' + '|'.join(alternatives) + r')(?!\w)')
     
     def normalize_country_name(self, country_name: str) -> str:
         """Normalize country name to match our storage format"""
@@ -80,11 +131,10 @@ class CountrySpecificVisaRAG:
             return matches[0]
         
         # Match on display names
-        display_names = {info['display_name'].lower(): key for key, info in self.country_mapping.items()}
-        matches = get_close_matches(query_country.lower(), list(display_names.keys()), n=1, cutoff=0.6)
+        matches = get_close_matches(query_country.lower(), list(self._display_to_key), n=1, cutoff=0.6)
         
         if matches:
-            return display_names[matches[0]]
+            return self._display_to_key[matches[0]]
         
         # Partial match
         for key, info in self.country_mapping.items():
@@ -112,6 +162,8 @@ class CountrySpecificVisaRAG:
             return None
         
         try:
+            from langchain_community.vectorstores import FAISS
+            
             logger.info(f"Loading vector store for {country_key} from {store_path}")
             vector_store = FAISS.load_local(
                 str(store_path),
@@ -135,25 +187,28 @@ class CountrySpecificVisaRAG:
             return []
         
         try:
-            # Get more documents initially for filtering
-            initial_k = self.config.top_k * 2
-            docs = vector_store.similarity_search(query, k=initial_k)
+            docs = []
+            
+            # Apply the language preference inside FAISS so the k budget is
+            # spent on matching chunks instead of being discarded afterwards
+            if preferred_language:
+                docs = vector_store.similarity_search(
+                    query,
+                    k=self.config.top_k,
+                    filter={'language': [preferred_language, 'mixed']},
+                    fetch_k=self.config.top_k * 4
+                )
+                if docs:
+                    logger.info(f"Filtered to {len(docs)} {preferred_language} documents")
+            
+            # No language preference or no matching chunks: unfiltered search
+            if not docs:
+                docs = vector_store.similarity_search(query, k=self.config.top_k * 2)
             
             if not docs:
                 logger.warning(f"No documents retrieved for query: {query}")
                 return []
             
-            # Filter by language preference if specified
-            if preferred_language:
-                filtered_docs = [
-                    doc for doc in docs 
-                    if doc.metadata.get('language') == preferred_language 
-                    or doc.metadata.get('language') == 'mixed'
-                ]
-                if filtered_docs:
-                    docs = filtered_docs[:self.config.top_k]
-                    logger.info(f"Filtered to {len(docs)} {preferred_language} documents")
-            
             # Sort by quality score
             docs_with_scores = [
                 (doc, doc.metadata.get('quality_confidence', 0.5))
@@ -218,7 +273,17 @@ Please try rephrasing your question or ask about visa requirements for {country_
             for doc in arabic_docs[:4]:
                 context_parts.append(f"[صفحة {doc.metadata.get('page', 'N/A')}]\n{doc.page_content}")
         
-        doc_contents = "\n\n".join(context_parts)[:15000]  # Limit total length
+        # Limit total length while assembling instead of joining everything and truncating
+        doc_parts = []
+        remaining = 15000
+        for i, part in enumerate(context_parts):
+            piece = part if i == 0 else f"\n\n{part}"
+            if len(piece) >= remaining:
+                doc_parts.append(piece[:remaining])
+                break
+            doc_parts.append(piece)
+            remaining -= len(piece)
+        doc_contents = "".join(doc_parts)
         
         prompt_template = f"""<|SYSTEM|>You are a visa requirements expert fluent in English and Arabic.
 
@@ -266,8 +331,8 @@ Need more help? I can also assist with flight and hotel bookings!""", documents)
 
     def _detect_query_language(self, query: str) -> Optional[str]:
         """Detect if query is in English or Arabic"""
-        arabic_chars = sum(1 for c in query if '\u0600' <= c <= '\u06FF')
-        latin_chars = sum(1 for c in query if c.isalpha() and c < '\u0600')
+        arabic_chars = len(ARABIC_RE.findall(query))
+        latin_chars = len(LATIN_RE.findall(query))
         
         if arabic_chars > latin_chars:
             return "arabic"
@@ -277,27 +342,36 @@ Need more help? I can also assist with flight and hotel bookings!""", documents)
 
     def extract_country_from_query(self, query: str) -> Optional[str]:
         """Extract country from query text"""
-        query_lower = query.lower()
-        for country_key, country_info in self.country_mapping.items():
-            if country_info['display_name'].lower() in query_lower:
-                return country_key
-        return None
+        if not self._country_re:
+            return None
+        match = self._country_re.search(query.lower())
+        return self._display_to_key[match.group(1)] if match else None
+
+_visa_rag: Optional[CountrySpecificVisaRAG] = None
+
+def get_visa_rag() -> CountrySpecificVisaRAG:
+    """Shared RAG instance so the embedding model and loaded stores are reused across requests.
+    While its country mapping is still empty (e.g. the vector stores were not built yet) it is re-read on each call."""
+    global _visa_rag
+    if _visa_rag is None:
+        _visa_rag = CountrySpecificVisaRAG(VisaRAGConfig())
+    elif not _visa_rag.country_mapping:
+        _visa_rag.refresh_country_mapping()
+    return _visa_rag
+
+def reset_visa_rag():
+    """Drop the shared RAG instance and cached mapping, e.g. after rebuilding the vector stores"""
+    global _visa_rag
+    _visa_rag = None
+    _read_country_mapping.cache_clear()
+    _read_available_countries.cache_clear()
 
 def enhanced_get_country(user_message: str, destination: Optional[str]) -> Optional[str]:
     """Enhanced country detection using available country mapping"""
     config = VisaRAGConfig()
-    mapping_file = Path(config.country_mapping_file)
+    available_countries = load_available_countries(config.country_mapping_file)
     
-    available_countries = []
-    if mapping_file.exists():
-        try:
-            with open(mapping_file, 'r', encoding='utf-8') as f:
-                country_mapping = json.load(f)
-            available_countries = [info['display_name'] for info in country_mapping.values()]
-        except Exception as e:
-            logger.error(f"Error loading countries for LLM context: {e}")
-    
-    countries_context = f"Available countries in our system: {', '.join(sorted(available_countries))}" if available_countries else "No country list available"
+    countries_context = f"Available countries in our system: {', '.join(sorted(name for name, _ in available_countries))}" if available_countries else "No country list available"
     dest_str = destination if destination else "None"
     
     prompt = f"""<|SYSTEM|>From the user message: '{user_message}'
@@ -322,8 +396,9 @@ Reply with ONLY the country name or 'None' - no extra text.
         
         if country and country.lower() != 'none':
             if available_countries:
-                for avail_country in available_countries:
-                    if country.lower() in avail_country.lower() or avail_country.lower() in country.lower():
+                country_lower = country.lower()
+                for avail_country, avail_lower in available_countries:
+                    if country_lower in avail_lower or avail_lower in country_lower:
                         logger.info(f"LLM detected and validated country: {avail_country}")
                         return avail_country
                 logger.warning(f"LLM returned '{country}' but it doesn't match available countries")
@@ -339,8 +414,7 @@ Reply with ONLY the country name or 'None' - no extra text.
 
 def visa_rag_node(state: TravelSearchState) -> TravelSearchState:
     """Enhanced visa RAG node with professional HTML output"""
-    config = VisaRAGConfig()
-    rag = CountrySpecificVisaRAG(config)
+    rag = get_visa_rag()
     
     user_message = state.get("current_message") or state.get("user_message", "")
     destination = state.get("destination")
@@ -675,8 +749,8 @@ def format_content_to_html(content: str) -> str:
 
 def check_system_status():
     """Check the status of the visa RAG system"""
-    config = VisaRAGConfig()
-    rag = CountrySpecificVisaRAG(config)
+    rag = get_visa_rag()
+    config = rag.config
     
     print(f"🔍 System Status Check")
     print(f"Embedding Model: {config.embeddings_model}")
@@ -1,6 +1,7 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
 from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
@@ -8,8 +9,8 @@ from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_core.documents import Document
 import arabic_reshaper
 from bidi.algorithm import get_display
-from langdetect import detect, LangDetectException
 from dotenv import load_dotenv
+from Utils.script_patterns import ARABIC_RE, LATIN_RE
 import os
 import json
 import re
@@ -28,6 +29,8 @@ class VisaRAGConfig:
     embeddings_model: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
     base_vector_store_path: str = "data/visa_vector_stores"
     country_mapping_file: str = "data/country_mapping.json"
+    max_workers: Optional[int] = None  # PDF parsing processes (None = CPU count)
+    embedding_batch_size: int = 64  # Chunks encoded per forward pass
 
 def extract_country_from_filename(pdf_file: Path) -> str:
     """Extract and normalize country name from PDF filename"""
@@ -42,8 +45,8 @@ def detect_language_robust(text: str) -> str:
     if not text or len(text.strip()) < 10:
         return "unknown"
     
-    arabic_chars = sum(1 for c in text if '\u0600' <= c <= '\u06FF')
-    latin_chars = sum(1 for c in text if c.isalpha() and c < '\u0600')
+    arabic_chars = len(ARABIC_RE.findall(text))
+    latin_chars = len(LATIN_RE.findall(text))
     total_chars = arabic_chars + latin_chars
     
     if total_chars == 0:
@@ -63,8 +66,8 @@ def assess_text_quality(text: str) -> Dict[str, any]:
     if not text or len(text.strip()) < 10:
         return {"quality": "poor", "reason": "too_short", "confidence": 0.0}
     
-    arabic_chars = sum(1 for c in text if '\u0600' <= c <= '\u06FF')
-    latin_chars = sum(1 for c in text if c.isalpha() and c < '\u0600')
+    arabic_chars = len(ARABIC_RE.findall(text))
+    latin_chars = len(LATIN_RE.findall(text))
     total_chars = len([c for c in text if c.isalpha()])
     
     if total_chars == 0:
@@ -161,24 +164,27 @@ def enhanced_load_pdf_for_country(pdf_file: Path, country_name: str) -> List[Doc
         
         print(f"Processing {len(docs)} pages from {pdf_file.name}...")
         
+        country_normalized = country_name.lower().replace(" ", "_")
+        file_size = pdf_file.stat().st_size if pdf_file.exists() else 0
+        
         for page_num, doc in enumerate(docs, 1):
             quality_info = assess_text_quality(doc.page_content)
             original_content = doc.page_content
             cleaned_content = clean_extracted_text(original_content)
             
-            # Split bilingual content
-            lang_split = split_bilingual_content(cleaned_content)
+            # Split bilingual content (only mixed pages can be split)
+            lang_split = split_bilingual_content(cleaned_content) if quality_info['is_mixed'] else None
             detected_lang = detect_language_robust(cleaned_content)
             
             # If mixed content, create separate documents for each language
-            if quality_info['is_mixed'] and len(lang_split['arabic']) > 50 and len(lang_split['english']) > 50:
+            if lang_split and len(lang_split['arabic']) > 50 and len(lang_split['english']) > 50:
                 # Arabic version
                 if lang_split['arabic']:
                     arabic_doc = Document(
                         page_content=lang_split['arabic'],
                         metadata={
                             "country": country_name,
-                            "country_normalized": country_name.lower().replace(" ", "_"),
+                            "country_normalized": country_normalized,
                             "source_file": str(pdf_file),
                             "page": page_num,
                             "doc_type": "visa_requirements",
@@ -186,7 +192,7 @@ def enhanced_load_pdf_for_country(pdf_file: Path, country_name: str) -> List[Doc
                             "content_type": "arabic_only",
                             "text_quality": quality_info['quality'],
                             "quality_confidence": quality_info['confidence'],
-                            "file_size": pdf_file.stat().st_size if pdf_file.exists() else 0
+                            "file_size": file_size
                         }
                     )
                     documents.append(arabic_doc)
@@ -197,7 +203,7 @@ def enhanced_load_pdf_for_country(pdf_file: Path, country_name: str) -> List[Doc
                         page_content=lang_split['english'],
                         metadata={
                             "country": country_name,
-                            "country_normalized": country_name.lower().replace(" ", "_"),
+                            "country_normalized": country_normalized,
                             "source_file": str(pdf_file),
                             "page": page_num,
                             "doc_type": "visa_requirements",
@@ -205,7 +211,7 @@ def enhanced_load_pdf_for_country(pdf_file: Path, country_name: str) -> List[Doc
                             "content_type": "english_only",
                             "text_quality": quality_info['quality'],
                             "quality_confidence": quality_info['confidence'],
-                            "file_size": pdf_file.stat().st_size if pdf_file.exists() else 0
+                            "file_size": file_size
                         }
                     )
                     documents.append(english_doc)
@@ -214,7 +220,7 @@ def enhanced_load_pdf_for_country(pdf_file: Path, country_name: str) -> List[Doc
                 doc.page_content = cleaned_content
                 doc.metadata.update({
                     "country": country_name,
-                    "country_normalized": country_name.lower().replace(" ", "_"),
+                    "country_normalized": country_normalized,
                     "source_file": str(pdf_file),
                     "page": page_num,
                     "doc_type": "visa_requirements",
@@ -226,7 +232,7 @@ def enhanced_load_pdf_for_country(pdf_file: Path, country_name: str) -> List[Doc
                     "latin_ratio": quality_info['latin_ratio'],
                     "original_length": len(original_content),
                     "cleaned_length": len(cleaned_content),
-                    "file_size": pdf_file.stat().st_size if pdf_file.exists() else 0
+                    "file_size": file_size
                 })
                 
                 if quality_info['quality'] == 'poor':
@@ -244,23 +250,29 @@ def enhanced_load_pdf_for_country(pdf_file: Path, country_name: str) -> List[Doc
     
     return documents
 
-def create_country_vector_stores():
-    """Create separate vector stores for each country with metadata filtering support"""
-    config = VisaRAGConfig()
-    
-    # Use multilingual embeddings
-    embeddings = HuggingFaceEmbeddings(
-        model_name=config.embeddings_model,
-        model_kwargs={'device': 'cpu'}
-    )
-    
-    # Custom splitter for better handling of bilingual content
-    text_splitter = RecursiveCharacterTextSplitter(
+def create_text_splitter(config: VisaRAGConfig) -> RecursiveCharacterTextSplitter:
+    """Custom splitter for better handling of bilingual content"""
+    return RecursiveCharacterTextSplitter(
         chunk_size=config.chunk_size,
         chunk_overlap=config.chunk_overlap,
         separators=["\n\n", "\n", ". ", "• ", " ", ""],
         length_function=len
     )
+
+def load_pdf_job(pdf_file: Path, config: VisaRAGConfig) -> tuple[List[Document], List[Document]]:
+    """Worker entry point: load and chunk one PDF in a separate process. Returns (pages, chunks)"""
+    documents = enhanced_load_pdf_for_country(pdf_file, extract_country_from_filename(pdf_file))
+    chunks = []
+    if documents:
+        try:
+            chunks = create_text_splitter(config).split_documents(documents)
+        except Exception as e:
+            print(f"✗ Error splitting {pdf_file}: {e}")
+    return documents, chunks
+
+def create_country_vector_stores():
+    """Create separate vector stores for each country with metadata filtering support"""
+    config = VisaRAGConfig()
     
     pdf_dir = Path(config.pdf_directory)
     base_store_dir = Path(config.base_vector_store_path)
@@ -281,6 +293,19 @@ def create_country_vector_stores():
     successful_countries = []
     failed_countries = []
     
+    # PDF parsing, text cleanup and chunking are CPU-bound and independent per
+    # file, so do them all in worker processes before embedding
+    print(f"Loading PDFs in parallel (max_workers={config.max_workers or os.cpu_count()})...")
+    with ProcessPoolExecutor(max_workers=config.max_workers) as executor:
+        loaded_documents = dict(zip(pdf_files, executor.map(load_pdf_job, pdf_files, [config] * len(pdf_files))))
+    
+    # Use multilingual embeddings (loaded after the pool so workers don't fork the model)
+    embeddings = HuggingFaceEmbeddings(
+        model_name=config.embeddings_model,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'batch_size': config.embedding_batch_size}
+    )
+    
     for pdf_file in pdf_files:
         try:
             country_name = extract_country_from_filename(pdf_file)
@@ -288,16 +313,13 @@ def create_country_vector_stores():
             
             print(f"\n🔄 Processing {country_name} ({pdf_file.name})...")
             
-            documents = enhanced_load_pdf_for_country(pdf_file, country_name)
+            documents, chunks = loaded_documents[pdf_file]
             
             if not documents:
                 print(f"⚠️  No documents loaded for {country_name}, skipping...")
                 failed_countries.append(country_name)
                 continue
             
-            # Split documents into chunks
-            chunks = text_splitter.split_documents(documents)
-            
             if not chunks:
                 print(f"⚠️  No chunks created for {country_name}, skipping...")
                 failed_countries.append(country_name)
@@ -309,10 +331,14 @@ def create_country_vector_stores():
             
             print(f"  Created {len(chunks)} chunks ({arabic_chunks} Arabic, {english_chunks} English)")
             
-            # Create FAISS vector store
-            vector_store = FAISS.from_documents(
-                documents=chunks,
-                embedding=embeddings
+            # Embed all chunks in one batched call, then build the FAISS index
+            texts = [c.page_content for c in chunks]
+            metadatas = [c.metadata for c in chunks]
+            vectors = embeddings.embed_documents(texts)
+            vector_store = FAISS.from_embeddings(
+                text_embeddings=list(zip(texts, vectors)),
+                embedding=embeddings,
+                metadatas=metadatas
             )
             
             # Save vector store
@@ -1,5 +1,4 @@
 from typing import Dict, Any
-from Models.InvoiceModels import InvoiceData
 
 def invoice_to_html(invoice_data: Dict[str, Any]) -> str:
     """Convert InvoiceData JSON to a clean HTML table."""
@@ -0,0 +1,6 @@
+import re
+
+# Shared by the vector store builder and the visa RAG node for Arabic/English detection
+ARABIC_RE = re.compile(r'[\u0600-\u06FF]')
+# Same as c.isalpha() and c < '\u0600' (letters below the Arabic block)
+LATIN_RE = re.compile(r'(?=[\x00-\u05FF])[^\W\d_\u00B2\u00B3\u00B9\u00BC-\u00BE]')
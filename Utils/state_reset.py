@@ -28,22 +28,15 @@ def reset_travel_state_for_new_search(state: TravelSearchState) -> TravelSearchS
             else:
                 state[field] = None
     
-    # Reset all flight offers
-    for i in range(1, 8):
-        if f"flight_offers_day_{i}" in state:
-            state[f"flight_offers_day_{i}"] = None
-    
-    # Reset hotel offers
-    for i in range(1, 8):
-        for field_type in ["checkin_date", "checkout_date", "hotel_offers_duration"]:
-            field_name = f"{field_type}_{i}" if field_type != "hotel_offers_duration" else f"hotel_offers_duration_{i}"
-            if field_name in state:
-                state[field_name] = None
+    # Reset per-day flight/hotel results
+    for field in ["flight_offers_by_day", "checkin_dates", "checkout_dates", "hotel_offers_by_duration"]:
+        if field in state:
+            state[field] = None
     
     # Reset package data
     package_reset_fields = [
         "hotel_ids", "hotel_id", "city_code", "currency", "room_quantity", "adult",
-        "hotel_offers", "travel_packages", "company_hotels_path", "company_hotels",
+        "hotel_offers", "travel_packages", "travel_packages_by_id", "company_hotels_path", "company_hotels",
         "body", "access_token", "package_summary", "travel_packages_html",
         "selected_offer", "package_results", "formatted_results"
     ]
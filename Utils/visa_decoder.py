@@ -29,6 +29,9 @@ paddle_logging.getLogger('ppocr').setLevel(paddle_logging.ERROR)
 ocr_engine_en = None
 ocr_engine_ar = None
 
+_ARABIC_RE = re.compile(r'[\u0600-\u06FF]')
+_LATIN_RE = re.compile(r'[A-Za-z]')
+
 
 def get_ocr_engines():
     """Lazy load OCR engines only when needed."""
@@ -311,8 +314,8 @@ def extract_text_from_pdf_structured(pdf_path: str) -> Tuple[str, str, Dict[str,
         arabic_lines = []
         
         for line in all_text_lines:
-            has_arabic = any('\u0600' <= char <= '\u06FF' for char in line)
-            has_latin = any('a' <= char.lower() <= 'z' for char in line)
+            has_arabic = _ARABIC_RE.search(line) is not None
+            has_latin = _LATIN_RE.search(line) is not None
             
             if has_arabic:
                 arabic_lines.append(line)
@@ -307,8 +307,8 @@ class TravelDataCollector:
             if not arrival_iso:
                 return None, None
             
-            checkin_dt = datetime.fromisoformat(arrival_iso.replace("Z", "+00:00"))
-            checkin_date = checkin_dt.date().strftime("%Y-%m-%d")
+            # Amadeus timestamps are ISO 8601, so the date is the first 10 characters
+            checkin_date = arrival_iso[:10]
             
             # Get return departure (check-out)
             checkout_date = None
@@ -318,11 +318,10 @@ class TravelDataCollector:
                     first_return = return_segments[0]
                     departure_iso = first_return.get("departure", {}).get("at")
                     if departure_iso:
-                        checkout_dt = datetime.fromisoformat(departure_iso.replace("Z", "+00:00"))
-                        checkout_date = checkout_dt.date().strftime("%Y-%m-%d")
+                        checkout_date = departure_iso[:10]
             
             if not checkout_date:
-                checkout_date = (checkin_dt.date() + timedelta(days=duration)).strftime("%Y-%m-%d")
+                checkout_date = (datetime.fromisoformat(checkin_date) + timedelta(days=duration)).strftime("%Y-%m-%d")
             
             return checkin_date, checkout_date
         except Exception as e:
@@ -16,7 +16,7 @@ from Models.ExtractedInfo import ExtractedInfo
 from Models.FlightResult import FlightResult
 from Models.ConversationStore import conversation_store
 from Nodes.invoice_extraction_json import invoice_extraction_json
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from Nodes.visa_rag_node import visa_rag_node
 from pathlib import Path
 import shutil
@@ -24,6 +24,7 @@ import uuid
 import json
 from Nodes.web_search_node import web_search_node
 from Nodes.greeting_conversation_node import greeting_conversation_node
+from Nodes.booking_node import summarize_documents
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
 
@@ -42,7 +43,8 @@ for key in required_keys:
 
 app = FastAPI(
     title="Flight Search Chatbot API",
-    description="AI-powered flight search assistant with thread-based conversations"
+    description="AI-powered flight search assistant with thread-based conversations",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -303,10 +305,15 @@ async def chat_endpoint(request: ChatRequest):
             
             # BOOKING-RELATED STATE (CRITICAL!)
             "travel_packages": previous_state.get("travel_packages", []),
+            "travel_packages_by_id": previous_state.get("travel_packages_by_id"),
             "passport_uploaded": previous_state.get("passport_uploaded", False),
             "passport_data": previous_state.get("passport_data", []),
+            "passport_valid": previous_state.get("passport_valid"),
+            "passport_count": previous_state.get("passport_count"),
             "visa_uploaded": previous_state.get("visa_uploaded", False),
             "visa_data": previous_state.get("visa_data", []),
+            "visa_valid": previous_state.get("visa_valid"),
+            "visa_count": previous_state.get("visa_count"),
             "booking_in_progress": previous_state.get("booking_in_progress", False),
             "selected_package_id": package_id if is_booking else previous_state.get("selected_package_id"),
             
@@ -362,12 +369,17 @@ async def chat_endpoint(request: ChatRequest):
             # TRAVEL PACKAGES
             "travel_packages_html": result.get("travel_packages_html"),
             "travel_packages": result.get("travel_packages", []),
+            "travel_packages_by_id": result.get("travel_packages_by_id"),
             
             # BOOKING STATE (preserve from result if available, else from previous_state)
             "passport_uploaded": result.get("passport_uploaded", previous_state.get("passport_uploaded", False)),
             "passport_data": result.get("passport_data", previous_state.get("passport_data", [])),
+            "passport_valid": result.get("passport_valid", previous_state.get("passport_valid")),
+            "passport_count": result.get("passport_count", previous_state.get("passport_count")),
             "visa_uploaded": result.get("visa_uploaded", previous_state.get("visa_uploaded", False)),
             "visa_data": result.get("visa_data", previous_state.get("visa_data", [])),
+            "visa_valid": result.get("visa_valid", previous_state.get("visa_valid")),
+            "visa_count": result.get("visa_count", previous_state.get("visa_count")),
             "booking_in_progress": result.get("booking_in_progress", previous_state.get("booking_in_progress", False)),
             "selected_package_id": result.get("selected_package_id", previous_state.get("selected_package_id")),
             
@@ -410,6 +422,7 @@ async def chat_endpoint(request: ChatRequest):
                 print(f"✓ Returning {len(result['travel_packages_html'])} travel packages (HTML)")
                 state_to_save["travel_search_completed"] = True
                 state_to_save["travel_packages"] = result.get("travel_packages", [])  
+                state_to_save["travel_packages_by_id"] = result.get("travel_packages_by_id")
                 conversation_store.save_state(request.thread_id, state_to_save)
                 assistant_message = "Here are your travel packages:"
                 conversation_store.add_message(request.thread_id, "assistant", assistant_message)
@@ -664,14 +677,19 @@ async def upload_passports(files: List[UploadFile], thread_id: str = Form(...)):
         
         logging.info(f"📦 Current state has {len(current_state.get('travel_packages', []))} packages")
 
+        passport_valid, passport_count = summarize_documents(passports_data)
+
         # Save state - PRESERVE ALL TRAVEL DATA
         state_to_save = {
             "passport_uploaded": True,
             "passport_data": passports_data,
+            "passport_valid": passport_valid,
+            "passport_count": passport_count,
             "passport_html": html_content,
             "passport_file_paths": saved_paths,
             # Preserve travel search data
             "travel_packages": current_state.get("travel_packages", []),
+            "travel_packages_by_id": current_state.get("travel_packages_by_id"),
             "travel_packages_html": current_state.get("travel_packages_html"),
             "departure_date": current_state.get("departure_date"),
             "origin": current_state.get("origin"),
@@ -684,6 +702,8 @@ async def upload_passports(files: List[UploadFile], thread_id: str = Form(...)):
             # Preserve visa data if exists
             "visa_uploaded": current_state.get("visa_uploaded", False),
             "visa_data": current_state.get("visa_data", []),
+            "visa_valid": current_state.get("visa_valid"),
+            "visa_count": current_state.get("visa_count"),
         }
         conversation_store.save_state(thread_id, state_to_save)
         
@@ -716,7 +736,6 @@ async def upload_passports(files: List[UploadFile], thread_id: str = Form(...)):
 
 
 from Utils.visa_decoder import process_visa_file,generate_visa_html
-from fastapi.responses import JSONResponse
 
 
 # Add VISA_DIR to directory structure at the top of main.py
@@ -805,13 +824,18 @@ async def upload_visas(files: List[UploadFile], thread_id: str = Form(...)):
         
         logging.info(f"📦 Current state has {len(current_state.get('travel_packages', []))} packages")
 
+        visa_valid, visa_count = summarize_documents(visas_data)
+
         # Save with proper flags - PRESERVE travel_packages
         state_to_save = {
             "visa_uploaded": True,
             "visa_data": visas_data,
+            "visa_valid": visa_valid,
+            "visa_count": visa_count,
             "visa_file_paths": saved_paths,
             # Preserve travel search data
             "travel_packages": current_state.get("travel_packages", []),
+            "travel_packages_by_id": current_state.get("travel_packages_by_id"),
             "travel_packages_html": current_state.get("travel_packages_html"),
             "departure_date": current_state.get("departure_date"),
             "origin": current_state.get("origin"),
@@ -824,6 +848,8 @@ async def upload_visas(files: List[UploadFile], thread_id: str = Form(...)):
             # Preserve passport data if exists
             "passport_uploaded": current_state.get("passport_uploaded", False),
             "passport_data": current_state.get("passport_data", []),
+            "passport_valid": current_state.get("passport_valid"),
+            "passport_count": current_state.get("passport_count"),
         }
         conversation_store.save_state(thread_id, state_to_save)
         
@@ -928,7 +954,7 @@ async def extract_invoices_details(
     # Filter out empty files early
     valid_files = [f for f in files if f.filename]
     if not valid_files:
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "total_files": 0,
             "results": []
@@ -941,7 +967,7 @@ async def extract_invoices_details(
     ]
     results = await asyncio.gather(*tasks, return_exceptions=False)
 
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "success": True,
         "total_files": len(results),
         "results": results
@@ -1035,7 +1061,7 @@ async def extract_passports_details(
     # Filter out invalid UploadFile objects early
     valid_files = [f for f in files if getattr(f, 'filename', None)]
     if not valid_files:
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "total_files": 0,
             "results": []
@@ -1045,7 +1071,7 @@ async def extract_passports_details(
     tasks = [_process_single_passport(f) for f in valid_files]
     results = await asyncio.gather(*tasks)
 
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "success": True,
         "total_files": len(results),
         "results": results